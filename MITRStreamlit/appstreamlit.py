@@ -1,7 +1,9 @@
 # app.py
 # Requirements:
 #   pip install streamlit pandas numpy plotly statsmodels
+#   pip install pyarrow  (optional: caches the balance data as Parquet)
 
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -88,7 +90,19 @@ Transformation & Reporting</h1></div>',
 # 3) Load data
 @st.cache_data
 def load_balance_data(path="balance_sheet_data.csv"):
-    df = pd.read_csv(path, parse_dates=['date'], dayfirst=True)
+    # Prefer a Parquet copy: typed columns, no date parsing, and far less I/O than the CSV.
+    # The first load of a newer CSV writes that copy next to it.
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(parquet_path) and (
+        not os.path.exists(path) or os.path.getmtime(parquet_path) >= os.path.getmtime(path)
+    ):
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = pd.read_csv(path, parse_dates=['date'], dayfirst=True)
+        try:
+            df.to_parquet(parquet_path, index=False)
+        except (ImportError, OSError):
+            pass
     df['month'] = df['date'].dt.month_name()
     df['year']  = df['date'].dt.year
     return df
@@ -70,34 +70,27 @@ journal_df = pd.DataFrame(journal_entries)
 # ----------------------------------------
 # Generate Daily Balance Snapshot
 # ----------------------------------------
-balance_records = []
-
-for book_id in sap_books["SAP_BOOK_ID"]:
-    book_journals = journal_df[journal_df["SAP_BOOK_ID"] == book_id].copy()
-    book_journals.sort_values("ENTRY_DATE", inplace=True)
-
-    opening_balance = sap_books.loc[sap_books["SAP_BOOK_ID"] == book_id, "OPENING_BALANCE"].values[0]
-    current_balance = opening_balance
-
-    for entry_date in date_range:
-        daily_journals = book_journals[book_journals["ENTRY_DATE"] == entry_date]
-        daily_sum = daily_journals["VALUE"].sum()
-        total_journals = len(daily_journals)
-        last_updated_by = daily_journals["POSTED_BY"].iloc[-1] if total_journals > 0 else None
-
-        daily_change = daily_sum
-        current_balance += daily_sum
-
-        balance_records.append({
-            "SAP_BOOK_ID": book_id,
-            "DATE": entry_date,
-            "BALANCE": current_balance,
-            "DAILY_CHANGE": daily_change,
-            "TOTAL_JOURNALS": total_journals,
-            "LAST_UPDATED_BY": last_updated_by
-        })
-
-balance_df = pd.DataFrame(balance_records)
+# One vectorized pass: aggregate each (book, date), fill days without journals,
+# then carry the running balance per book with a cumulative sum.
+daily = journal_df.groupby(["SAP_BOOK_ID", "ENTRY_DATE"]).agg(
+    DAILY_CHANGE=("VALUE", "sum"),
+    TOTAL_JOURNALS=("VALUE", "size"),
+    LAST_UPDATED_BY=("POSTED_BY", "last"),
+)
+daily.index.names = ["SAP_BOOK_ID", "DATE"]
+all_days = pd.MultiIndex.from_product([sap_books["SAP_BOOK_ID"], date_range], names=["SAP_BOOK_ID", "DATE"])
+daily = daily.reindex(all_days)
+daily["DAILY_CHANGE"] = daily["DAILY_CHANGE"].fillna(0).astype("int64")
+daily["TOTAL_JOURNALS"] = daily["TOTAL_JOURNALS"].fillna(0).astype("int64")
+
+opening_balance = daily.index.get_level_values("SAP_BOOK_ID").map(
+    dict(zip(sap_books["SAP_BOOK_ID"], sap_books["OPENING_BALANCE"]))
+)
+daily["BALANCE"] = opening_balance + daily.groupby(level="SAP_BOOK_ID")["DAILY_CHANGE"].cumsum()
+
+balance_df = daily.reset_index()[
+    ["SAP_BOOK_ID", "DATE", "BALANCE", "DAILY_CHANGE", "TOTAL_JOURNALS", "LAST_UPDATED_BY"]
+]
 
 # ----------------------------------------
 # Save CSVs
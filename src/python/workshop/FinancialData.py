@@ -1,99 +1,278 @@
-import json
+import asyncio
 import logging
+import os
+import time
 from typing import Optional
 import aiosqlite
-import pandas as pd
-from terminal_colors import TerminalColors as tc
+from connection_pool import POOL_MAX_SIZE, POOL_MIN_SIZE, SQLiteConnectionPool
+from data_backend import PROGRESS_HANDLER_STEPS, QUERY_TIMEOUT_SECONDS, DataBackend, QueryTimeoutError
+from index_advisor import async_explain_query_plan, format_query_plan, full_scans
+from query_cache import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from result_serializer import (
+    FETCH_BATCH_SIZE,
+    NO_RESULTS,
+    RESULT_MAX_BYTES,
+    RESULT_MAX_ROWS,
+    SplitJsonWriter,
+    write_async_cursor,
+)
+from rollups import ROLLUP_STATE_TABLE, ROLLUPS
+from schema_cache import SCHEMA_CACHE_FILE, SchemaDigestCache, database_identity
 from utilities import Utilities
 
 DATA_BASE = "database/financial_data.db"
+# Log EXPLAIN QUERY PLAN output (and warn on full table scans) for every tool query.
+EXPLAIN_QUERIES = os.getenv("EXPLAIN_QUERY_PLAN", "").lower() in {"1", "true", "yes"}
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
-class FinancialData:
-    conn: Optional[aiosqlite.Connection]
+class FinancialData(DataBackend):
+    pool: Optional[SQLiteConnectionPool]
+    name = "sqlite"
+    instructions_file = "instructions/code_interpreter.txt"
+    error_key = "SQLite query failed"
 
-    def __init__(self: "FinancialData", utilities: Utilities) -> None:
-        self.conn = None
-        self.utilities = utilities
+    def __init__(
+        self: "FinancialData",
+        utilities: Utilities,
+        pool_min_size: int = POOL_MIN_SIZE,
+        pool_max_size: int = POOL_MAX_SIZE,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = CACHE_MAX_BYTES,
+        cache_ttl: float = CACHE_TTL_SECONDS,
+        fetch_batch_size: int = FETCH_BATCH_SIZE,
+        result_max_bytes: int = RESULT_MAX_BYTES,
+        result_max_rows: int = RESULT_MAX_ROWS,
+        query_timeout: float = QUERY_TIMEOUT_SECONDS,
+        explain_queries: bool = EXPLAIN_QUERIES,
+    ) -> None:
+        super().__init__(
+            utilities,
+            cache_max_entries=cache_max_entries,
+            cache_max_bytes=cache_max_bytes,
+            cache_ttl=cache_ttl,
+            fetch_batch_size=fetch_batch_size,
+            result_max_bytes=result_max_bytes,
+            result_max_rows=result_max_rows,
+            query_timeout=query_timeout,
+        )
+        self.pool = None
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.explain_queries = explain_queries
+        self.schema_cache = SchemaDigestCache(utilities.shared_files_path / SCHEMA_CACHE_FILE)
+
+    @property
+    def db_path(self: "FinancialData") -> str:
+        return f"{self.utilities.shared_files_path}/{DATA_BASE}"
+
+    def _data_version(self: "FinancialData") -> tuple:
+        """Cheap change marker for the database: mtime and size of the db and WAL files."""
+        identity = database_identity(self.db_path)
+        if identity is None:
+            return (None, None)
+        wal = identity["wal"]
+        return ((identity["mtime_ns"], identity["size"]), (wal["mtime_ns"], wal["size"]) if wal else None)
 
     async def connect(self: "FinancialData") -> None:
-        db_uri = f"file:{self.utilities.shared_files_path}/{DATA_BASE}?mode=ro"
+        if self.pool:
+            return
+        db_uri = f"file:{self.db_path}?mode=ro"
+        pool = SQLiteConnectionPool(db_uri, min_size=self.pool_min_size, max_size=self.pool_max_size)
         try:
-            self.conn = await aiosqlite.connect(db_uri, uri=True)
-            logger.debug("Database connection opened.")
+            await pool.open()
+            self.pool = pool
+            logger.debug("Database connection pool opened.")
         except aiosqlite.Error as e:
             logger.exception("Error opening database", exc_info=e)
-            self.conn = None
+            await pool.close()
+            self.pool = None
 
     async def close(self: "FinancialData") -> None:
-        if self.conn:
-            await self.conn.close()
-            logger.debug("Database connection closed.")
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+            logger.debug("Database connection pool closed.")
+
+    def pool_metrics(self: "FinancialData") -> dict:
+        return self.pool.metrics() if self.pool else {}
+
+    def tool_functions(self: "FinancialData") -> set:
+        return {self.async_fetch_data_using_sqlite_query}
 
     async def _get_table_names(self: "FinancialData") -> list:
-        async with self.conn.execute("SELECT name FROM sqlite_master WHERE type='table';") as tables:
-            return [table[0] async for table in tables if table[0] != "sqlite_sequence"]
+        async with self.pool.acquire() as conn:
+            # sqlite_% covers SQLite's internal tables (sqlite_sequence, sqlite_stat1 from ANALYZE, ...).
+            async with conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';"
+            ) as tables:
+                return [table[0] async for table in tables if table[0] != ROLLUP_STATE_TABLE]
 
     async def _get_column_info(self: "FinancialData", table_name: str) -> list:
-        async with self.conn.execute(f"PRAGMA table_info('{table_name}');") as columns:
-            return [f"{col[1]}: {col[2]}" async for col in columns]
+        async with self.pool.acquire() as conn:
+            async with conn.execute(f"PRAGMA table_info('{table_name}');") as columns:
+                return [f"{col[1]}: {col[2]}" async for col in columns]
 
     async def _get_transaction_types(self: "FinancialData") -> list:
         query = "SELECT DISTINCT TRANSACTION_TYPE FROM journaldata;"  # Corrected the table name
-        async with self.conn.execute(query) as cursor:
-            result = await cursor.fetchall()
+        async with self.pool.acquire() as conn:
+            async with conn.execute(query) as cursor:
+                result = await cursor.fetchall()
         return [row[0] for row in result if row[0] is not None]
 
     async def _get_currencies(self: "FinancialData") -> list:
         query = "SELECT DISTINCT TRANSACTION_CURRENCY FROM journaldata;"  # Corrected the table name
-        async with self.conn.execute(query) as cursor:
-            result = await cursor.fetchall()
+        async with self.pool.acquire() as conn:
+            async with conn.execute(query) as cursor:
+                result = await cursor.fetchall()
         return [row[0] for row in result if row[0] is not None]
 
     async def _get_years(self: "FinancialData") -> list:
         query = "SELECT DISTINCT substr(ENTRY_DATE, 1, 4) AS year FROM journaldata ORDER BY year;"  # Corrected the table name
-        async with self.conn.execute(query) as cursor:
-            result = await cursor.fetchall()
+        async with self.pool.acquire() as conn:
+            async with conn.execute(query) as cursor:
+                result = await cursor.fetchall()
         return [row[0] for row in result if row[0] is not None]
 
-    async def get_database_info(self: "FinancialData") -> str:
-        table_dicts = []
-        for table_name in await self._get_table_names():
-            columns_names = await self._get_column_info(table_name)
-            table_dicts.append({"table_name": table_name, "column_names": columns_names})
-
-        database_info = "\n".join(
-            [
-                f"Table {table['table_name']} Schema: Columns: {', '.join(table['column_names'])}"
-                for table in table_dicts
-            ]
-        )
-        txn_types = await self._get_transaction_types()
-        currencies = await self._get_currencies()
-        years = await self._get_years()
+    async def _get_schema_version(self: "FinancialData") -> int:
+        async with self.pool.acquire() as conn:
+            async with conn.execute("PRAGMA schema_version;") as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def _get_table_state(self: "FinancialData", table_name: str) -> dict:
+        """A table's CREATE statement and highest rowid."""
+        async with self.pool.acquire() as conn:
+            async with conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?;", (table_name,)) as cursor:
+                sql = (await cursor.fetchone())[0]
+            try:
+                async with conn.execute(f"SELECT max(rowid) FROM '{table_name}';") as cursor:
+                    max_rowid = (await cursor.fetchone())[0]
+            except aiosqlite.OperationalError:
+                # WITHOUT ROWID tables have no rowid.
+                max_rowid = None
+        return {"sql": sql, "max_rowid": max_rowid}
+
+    async def _get_rollup_watermarks(self: "FinancialData") -> dict:
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.execute(f"SELECT ROLLUP_NAME, LAST_ROWID FROM {ROLLUP_STATE_TABLE};") as cursor:
+                    return {row[0]: row[1] async for row in cursor}
+            except aiosqlite.OperationalError:
+                return {}
+
+    async def _get_schema_digest(self: "FinancialData", refresh: bool = False) -> dict:
+        """Return the schema digest, re-reading only the tables that changed since it was cached."""
+        identity = database_identity(self.db_path)
+        schema_version = await self._get_schema_version()
+        cached = None if refresh else self.schema_cache.load(self.db_path)
+        if cached and cached.get("identity") == identity and cached.get("schema_version") == schema_version:
+            logger.debug("Schema digest loaded from cache.")
+            return cached
+        if cached and (not identity or not cached.get("identity") or (
+            cached["identity"]["dev"], cached["identity"]["ino"]) != (identity["dev"], identity["ino"])
+        ):
+            # The file was replaced rather than modified: nothing in the cache can be trusted.
+            cached = None
+
+        cached_tables = cached.get("tables", {}) if cached else {}
+        table_names = await self._limited(self._get_table_names())
+        states = await asyncio.gather(*(self._limited(self._get_table_state(name)) for name in table_names))
+        tables = dict(zip(table_names, states))
+
+        # Column lookups for changed tables and the journaldata scans all run concurrently.
+        # Column names are reused while a table's CREATE statement is unchanged. The journaldata
+        # values are always re-read here: the database changed, and no cheap marker (max rowid,
+        # last row) catches an UPDATE or DELETE in the middle of the table.
+        column_lookups = {}
+        for table_name, state in tables.items():
+            previous = cached_tables.get(table_name)
+            if previous and previous["sql"] == state["sql"]:
+                state["column_names"] = previous["column_names"]
+            else:
+                column_lookups[table_name] = self._limited(self._get_column_info(table_name))
 
-        database_info += f"\nTransaction Types: {', '.join(txn_types)}"
-        database_info += f"\nCurrencies: {', '.join(currencies)}"
-        database_info += f"\nYears: {', '.join(years)}"
-        database_info += "\n\n"
+        journal_lookups = {
+            "transaction_types": self._limited(self._get_transaction_types()),
+            "currencies": self._limited(self._get_currencies()),
+            "years": self._limited(self._get_years()),
+        }
 
-        return database_info
+        results = await asyncio.gather(*column_lookups.values(), *journal_lookups.values())
+        for table_name, column_names in zip(column_lookups, results):
+            tables[table_name]["column_names"] = column_names
+        journal_values = dict(zip(journal_lookups, results[len(column_lookups):]))
+
+        # Only advertise rollups that have caught up with journaldata (a watermark above its
+        # max rowid means journaldata was reloaded and the rollup is stale until it is rebuilt).
+        watermarks = await self._limited(self._get_rollup_watermarks())
+        journal_max_rowid = tables["journaldata"]["max_rowid"] if "journaldata" in tables else None
+        rollups = [
+            table_name
+            for table_name in ROLLUPS
+            if table_name in tables
+            and journal_max_rowid is not None
+            and watermarks.get(table_name, -1) == journal_max_rowid
+        ]
+
+        digest = {
+            "identity": identity,
+            "schema_version": schema_version,
+            "tables": tables,
+            "journal_values": journal_values,
+            "rollups": rollups,
+        }
+        self.schema_cache.save(self.db_path, digest)
+        return digest
 
     async def async_fetch_data_using_sqlite_query(self: "FinancialData", sqlite_query: str) -> str:
-        print(f"\n{tc.BLUE}Function Call: async_fetch_data_using_sqlite_query{tc.RESET}")
-        print(f"{tc.BLUE}Executing query: {sqlite_query}{tc.RESET}\n")
+        return await self.fetch_data("async_fetch_data_using_sqlite_query", sqlite_query)
+
+    async def _execute(self: "FinancialData", sqlite_query: str) -> tuple:
+        async with self.pool.acquire() as conn:
+            if self.explain_queries:
+                await self._explain(conn, sqlite_query)
+            return await self._run_limited_query(conn, sqlite_query)
 
+    async def _explain(self: "FinancialData", conn: aiosqlite.Connection, sqlite_query: str) -> None:
         try:
-            async with self.conn.execute(sqlite_query) as cursor:
-                rows = await cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
+            plan = await async_explain_query_plan(conn, sqlite_query)
+        except aiosqlite.Error as e:
+            self.utilities.log_msg_yellow(f"Could not explain query: {e}")
+            return
+        # Printed rather than logged: the apps configure logging at ERROR level.
+        self.utilities.log_msg_purple(format_query_plan(sqlite_query, plan))
+        scans = full_scans(plan)
+        if scans:
+            self.utilities.log_msg_yellow(f"⚠️ Full table scan in query: {'; '.join(scans)}")
 
-            if not rows:
-                return json.dumps("The query returned no results.")
-            df = pd.DataFrame(rows, columns=columns)
-            return df.to_json(index=False, orient="split")
+    async def _run_limited_query(self: "FinancialData", conn: aiosqlite.Connection, sqlite_query: str) -> tuple:
+        """Run a query under the row, byte and time limits.
+
+        Returns the serialized result and whether it is complete (not cut short by the timeout).
+        """
+        deadline = time.monotonic() + self.query_timeout
+
+        def progress_handler() -> int:
+            # Runs on the connection's worker thread; a non-zero return interrupts the query.
+            return 1 if time.monotonic() > deadline else 0
+
+        await conn.set_progress_handler(progress_handler, PROGRESS_HANDLER_STEPS)
+        writer = None
+        try:
+            async with conn.execute(sqlite_query) as cursor:
+                if cursor.description is None:
+                    return NO_RESULTS, True
+                columns = [description[0] for description in cursor.description]
+                writer = SplitJsonWriter(columns, max_bytes=self.result_max_bytes, max_rows=self.result_max_rows)
+                await write_async_cursor(writer, cursor, self.fetch_batch_size, deadline)
+        except aiosqlite.OperationalError as e:
+            if "interrupted" not in str(e) or time.monotonic() <= deadline:
+                raise
+            if writer is None:
+                raise QueryTimeoutError(sqlite_query) from e
+            writer.truncate("timeout")
+        finally:
+            await conn.set_progress_handler(None, 0)
 
-        except Exception as e:
-            return json.dumps({"SQLite query failed": str(e), "query": sqlite_query})
+        return writer.result(), writer.truncated_reason != "timeout"
@@ -1,10 +1,20 @@
-import json
 import logging
-from typing import Optional
-import pyodbc
-import pandas as pd
+import math
+import sqlite3
+import sys
+from typing import Any, Callable, Optional
 import asyncio
-from terminal_colors import TerminalColors as tc
+import time
+from data_backend import PROGRESS_HANDLER_STEPS, QUERY_TIMEOUT_SECONDS, DataBackend, QueryTimeoutError
+from result_serializer import (
+    FETCH_BATCH_SIZE,
+    NO_RESULTS,
+    RESULT_MAX_BYTES,
+    RESULT_MAX_ROWS,
+    SplitJsonWriter,
+    write_cursor,
+)
+from threaded_connection_pool import THREAD_POOL_SIZE, ThreadBoundConnectionPool, never_disconnect
 from utilities import Utilities
 
 # Define the connection string for SQL Server (update these values as needed)
@@ -24,60 +34,145 @@ SQL_SERVER_CONNECTION_STRING = (
     f"TrustServerCertificate=no;"
     f"Connection Timeout=30;"
 )
+# SQLSTATEs for a lost or unusable connection; the pool reconnects and retries once.
+DISCONNECT_SQLSTATES = {"08001", "08003", "08007", "08S01", "HYT01"}
+# SQLSTATE of a statement that ran past the driver-side query timeout.
+QUERY_TIMEOUT_SQLSTATE = "HYT00"
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
-class FinancialDataSQLServer:
-    conn: Optional[pyodbc.Connection]
+def _sqlstate(error: BaseException) -> Optional[str]:
+    """SQLSTATE of a pyodbc error, None for any other error."""
+    # pyodbc is only loaded once a connection was opened through it.
+    pyodbc = sys.modules.get("pyodbc")
+    if pyodbc is not None and isinstance(error, pyodbc.Error) and error.args:
+        return error.args[0]
+    return None
+
+
+def is_disconnect(error: BaseException) -> bool:
+    """Whether a pyodbc error means the connection is gone."""
+    return _sqlstate(error) in DISCONNECT_SQLSTATES
+
+
+def is_query_timeout(error: BaseException) -> bool:
+    """Whether a query was stopped by the statement timeout (pyodbc) or the progress handler (sqlite3)."""
+    if isinstance(error, sqlite3.OperationalError):
+        return "interrupted" in str(error)
+    return _sqlstate(error) == QUERY_TIMEOUT_SQLSTATE
+
+
+def _is_sqlite(conn: Any) -> bool:
+    """Whether conn is a local sqlite3 stand-in rather than a SQL Server connection."""
+    return isinstance(conn, sqlite3.Connection)
+
+
+class FinancialDataSQLServer(DataBackend):
+    pool: ThreadBoundConnectionPool
+    name = "sqlserver"
+    instructions_file = "instructions/sqlserver_interpreter.txt"
+
+    def __init__(
+        self: "FinancialDataSQLServer",
+        utilities: Utilities,
+        pool_size: int = THREAD_POOL_SIZE,
+        fetch_batch_size: int = FETCH_BATCH_SIZE,
+        result_max_bytes: int = RESULT_MAX_BYTES,
+        result_max_rows: int = RESULT_MAX_ROWS,
+        query_timeout: float = QUERY_TIMEOUT_SECONDS,
+        connection_string: str = SQL_SERVER_CONNECTION_STRING,
+        connect: Optional[Callable[[], Any]] = None,
+        is_disconnect_error: Optional[Callable[[BaseException], bool]] = None,
+    ) -> None:
+        super().__init__(
+            utilities,
+            fetch_batch_size=fetch_batch_size,
+            result_max_bytes=result_max_bytes,
+            result_max_rows=result_max_rows,
+            query_timeout=query_timeout,
+        )
+        self.connection_string = connection_string
+        # pyodbc connections must not be shared between threads, so every
+        # connection lives on its own pool worker thread. Pass connect to run
+        # against another DB-API driver, e.g. a local sqlite3 stand-in, and
+        # is_disconnect_error to recognise its lost connections.
+        if is_disconnect_error is None:
+            is_disconnect_error = is_disconnect if connect is None else never_disconnect
+        self.pool = ThreadBoundConnectionPool(
+            connect or self._open_connection,
+            size=pool_size,
+            is_disconnect=is_disconnect_error,
+            name="sqlserver",
+        )
 
-    def __init__(self: "FinancialDataSQLServer", utilities: Utilities) -> None:
-        self.conn = None
-        self.utilities = utilities
+    def _open_connection(self) -> Any:
+        # Imported here so the driver is only needed for real SQL Server connections.
+        import pyodbc
+
+        conn = pyodbc.connect(self.connection_string)
+        # Driver-side statement timeout (SQL_ATTR_QUERY_TIMEOUT, whole seconds) for every cursor on this connection.
+        conn.timeout = math.ceil(self.query_timeout)
+        return conn
 
     async def connect(self: "FinancialDataSQLServer") -> None:
-        """Establish a connection to the SQL Server database."""
+        """Open the pooled connections to the SQL Server database."""
         try:
-            self.conn = pyodbc.connect(SQL_SERVER_CONNECTION_STRING)
-            logger.debug("Database connection opened.")
+            await self.pool.open()
+            logger.debug("Database connection pool opened.")
         except Exception as e:
+            # Workers whose connection failed retry when they run their next query.
             logger.exception("Error opening database", exc_info=e)
-            self.conn = None
 
     async def close(self: "FinancialDataSQLServer") -> None:
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
-            logger.debug("Database connection closed.")
+        """Close the pooled database connections."""
+        await self.pool.close()
+        logger.debug("Database connection pool closed.")
+
+    def pool_metrics(self: "FinancialDataSQLServer") -> dict:
+        return self.pool.metrics()
+
+    def tool_functions(self: "FinancialDataSQLServer") -> set:
+        return {self.async_fetch_data_using_sqlserver_query}
+
+    async def _run_introspection(self, fn, *args):
+        """Run a blocking introspection query on a pool worker, under the concurrency limit."""
+        return await self._limited(self.pool.run(fn, *args))
 
     async def _get_table_names(self: "FinancialDataSQLServer") -> list:
         """Get a list of table names in the SQL Server database."""
-        return await asyncio.to_thread(self._fetch_table_names)
+        return await self._run_introspection(self._fetch_table_names)
 
-    def _fetch_table_names(self):
-        cursor = self.conn.cursor()
-        query = "SELECT table_name FROM information_schema.tables WHERE table_type = 'BASE TABLE';"
+    def _fetch_table_names(self, conn):
+        cursor = conn.cursor()
+        if _is_sqlite(conn):
+            query = "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';"
+        else:
+            query = "SELECT table_name FROM information_schema.tables WHERE table_type = 'BASE TABLE';"
         cursor.execute(query)
         tables = cursor.fetchall()
         return [table[0] for table in tables]
 
     async def _get_column_info(self: "FinancialDataSQLServer", table_name: str) -> list:
         """Get column information for a specific table in SQL Server."""
-        return await asyncio.to_thread(self._fetch_column_info, table_name)
+        return await self._run_introspection(self._fetch_column_info, table_name)
 
-    def _fetch_column_info(self, table_name: str):
-        cursor = self.conn.cursor()
-        query = f"SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ?"
+    def _fetch_column_info(self, conn, table_name: str):
+        cursor = conn.cursor()
+        if _is_sqlite(conn):
+            query = "SELECT name, type FROM pragma_table_info(?);"
+        else:
+            query = "SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ?"
         cursor.execute(query, (table_name,))
         columns = cursor.fetchall()
         return [f"{col[0]}: {col[1]}" for col in columns]
 
     async def _get_transaction_types(self: "FinancialDataSQLServer") -> list:
         """Fetch distinct transaction types from the journaldata table."""
-        return await asyncio.to_thread(self._fetch_transaction_types)
+        return await self._run_introspection(self._fetch_transaction_types)
 
-    def _fetch_transaction_types(self):
-        cursor = self.conn.cursor()
+    def _fetch_transaction_types(self, conn):
+        cursor = conn.cursor()
         query = "SELECT DISTINCT TRANSACTION_TYPE FROM journaldata;"
         cursor.execute(query)
         result = cursor.fetchall()
@@ -85,10 +180,10 @@ class FinancialDataSQLServer:
 
     async def _get_currencies(self: "FinancialDataSQLServer") -> list:
         """Fetch distinct transaction currencies from the journaldata table."""
-        return await asyncio.to_thread(self._fetch_currencies)
+        return await self._run_introspection(self._fetch_currencies)
 
-    def _fetch_currencies(self):
-        cursor = self.conn.cursor()
+    def _fetch_currencies(self, conn):
+        cursor = conn.cursor()
         query = "SELECT DISTINCT TRANSACTION_CURRENCY FROM journaldata;"
         cursor.execute(query)
         result = cursor.fetchall()
@@ -96,59 +191,80 @@ class FinancialDataSQLServer:
 
     async def _get_years(self: "FinancialDataSQLServer") -> list:
         """Fetch distinct years from the journaldata table."""
-        return await asyncio.to_thread(self._fetch_years)
+        return await self._run_introspection(self._fetch_years)
 
-    def _fetch_years(self):
-        cursor = self.conn.cursor()
-        query = "SELECT DISTINCT YEAR(ENTRY_DATE) AS year FROM journaldata ORDER BY year;"
+    def _fetch_years(self, conn):
+        cursor = conn.cursor()
+        if _is_sqlite(conn):
+            query = "SELECT DISTINCT CAST(substr(ENTRY_DATE, 1, 4) AS INTEGER) AS year FROM journaldata ORDER BY year;"
+        else:
+            query = "SELECT DISTINCT YEAR(ENTRY_DATE) AS year FROM journaldata ORDER BY year;"
         cursor.execute(query)
         result = cursor.fetchall()
         return [row[0] for row in result if row[0] is not None]
 
-    async def get_database_info(self: "FinancialDataSQLServer") -> str:
-        """Get the schema information of the SQL Server database."""
-        table_dicts = []
-        for table_name in await self._get_table_names():
-            columns_names = await self._get_column_info(table_name)
-            table_dicts.append({"table_name": table_name, "column_names": columns_names})
-
-        database_info = "\n".join(
-            [
-                f"Table {table['table_name']} Schema: Columns: {', '.join(table['column_names'])}"
-                for table in table_dicts
-            ]
+    async def _get_schema_digest(self: "FinancialDataSQLServer", refresh: bool = False) -> dict:
+        """Read the schema and the journaldata values the agent needs."""
+        table_names = await self._get_table_names()
+        # Column lookups and the DISTINCT queries all run concurrently.
+        *column_infos, txn_types, currencies, years = await asyncio.gather(
+            *(self._get_column_info(table_name) for table_name in table_names),
+            self._get_transaction_types(),
+            self._get_currencies(),
+            self._get_years(),
         )
-        txn_types = await self._get_transaction_types()
-        currencies = await self._get_currencies()
-        years = await self._get_years()
-
-        # Fix applied here: Map each item in years list to string
-        database_info += f"\nTransaction Types: {', '.join(txn_types)}"
-        database_info += f"\nCurrencies: {', '.join(currencies)}"
-        database_info += f"\nYears: {', '.join(map(str, years))}"  # Fix applied
-        database_info += "\n\n"
-
-        return database_info
+        return {
+            "tables": {
+                table_name: {"column_names": column_names}
+                for table_name, column_names in zip(table_names, column_infos)
+            },
+            "journal_values": {"transaction_types": txn_types, "currencies": currencies, "years": years},
+            "rollups": [],
+        }
 
     async def async_fetch_data_using_sqlserver_query(self: "FinancialDataSQLServer", sql_query: str) -> str:
         """Execute a raw SQL query and return the result as a JSON string."""
-        print(f"\n{tc.BLUE}Function Call: async_fetch_data_using_sql_server_query{tc.RESET}")
-        print(f"{tc.BLUE}Executing query: {sql_query}{tc.RESET}\n")
+        return await self.fetch_data("async_fetch_data_using_sql_server_query", sql_query)
 
+    async def _execute(self: "FinancialDataSQLServer", sql_query: str) -> tuple:
+        return await self.pool.run(self._fetch_query_result, sql_query)
+
+    def _fetch_query_result(self, conn, sql_query: str) -> tuple:
+        """Run a query on a pool worker under the row, byte and time limits.
+
+        Returns the serialized result and whether it is complete (not cut short by the timeout).
+        """
+        deadline = time.monotonic() + self.query_timeout
+        sqlite = _is_sqlite(conn)
+        if sqlite:
+            # The stand-in has no statement timeout; a non-zero return interrupts the query.
+            conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, PROGRESS_HANDLER_STEPS)
+        writer = None
         try:
-            result = await asyncio.to_thread(self._fetch_query_result, sql_query)
-            return result
+            cursor = conn.cursor()
+            cursor.execute(sql_query)
+            if cursor.description is None:
+                return NO_RESULTS, True
+            columns = [description[0] for description in cursor.description]
+            writer = SplitJsonWriter(columns, max_bytes=self.result_max_bytes, max_rows=self.result_max_rows)
+            write_cursor(writer, cursor, self.fetch_batch_size, deadline)
         except Exception as e:
-            return json.dumps({"SQL query failed": str(e), "query": sql_query})
-
-    def _fetch_query_result(self, sql_query: str):
-        cursor = self.conn.cursor()
-        cursor.execute(sql_query)
-        rows = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
-
-        if not rows:
-            return json.dumps("The query returned no results.")
-        
-        df = pd.DataFrame(rows, columns=columns)
-        return df.to_json(index=False, orient="split")
+            if not is_query_timeout(e):
+                raise
+            if writer is None:
+                raise QueryTimeoutError(sql_query) from e
+            writer.truncate("timeout")
+        finally:
+            if sqlite:
+                conn.set_progress_handler(None, 0)
+
+        return writer.result(), writer.truncated_reason != "timeout"
+
+    async def export_query(
+        self: "FinancialDataSQLServer", sql_query: str, path: str, file_format: str = "parquet", arraysize: Optional[int] = None
+    ) -> int:
+        """Stream a query's result into a Parquet or CSV file in fetchmany batches. Returns the row count."""
+        # Imported here so pandas and pyarrow are only loaded when something is exported.
+        from columnar_fetch import FETCH_ARRAYSIZE, export_query
+
+        return await self.pool.run(export_query, sql_query, path, file_format, arraysize or FETCH_ARRAYSIZE)
@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.projects.models import Agent, AsyncToolSet
+from azure.core.exceptions import ResourceNotFoundError
+
+from json_store import JsonStore
+
+logger = logging.getLogger(__name__)
+
+AGENT_REGISTRY_FILE = "cache/agent_registry.json"
+
+
+def registry_key(name: str, backend: str = "") -> str:
+    """Registry entry for an agent; agents of the same name serving different data backends are kept apart."""
+    return f"{name}@{backend}" if backend else name
+
+
+def _as_dict(model: Any) -> Any:
+    return model.as_dict() if hasattr(model, "as_dict") else str(model)
+
+
+def agent_fingerprint(model: str, name: str, instructions: str, toolset: AsyncToolSet, **settings: Any) -> str:
+    """Hash of everything that defines the agent on the service side."""
+    definition = {
+        "model": model,
+        "name": name,
+        "instructions": instructions,
+        "tools": [_as_dict(tool) for tool in toolset.definitions],
+        "tool_resources": _as_dict(toolset.resources),
+        "settings": settings,
+    }
+    encoded = json.dumps(definition, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class AgentRegistry:
+    """Reuse agents across restarts and chat sessions.
+
+    Remembers the agent ID and definition fingerprint per agent name and
+    data backend in a small JSON file. An agent is created only when none exists yet or its
+    definition (model, instructions, tools, settings) changed. The replaced
+    agent is deleted unless ``delete_replaced`` is off, e.g. while other
+    sessions may still be talking to it.
+    """
+
+    def __init__(self, registry_path: Path, delete_replaced: bool = True) -> None:
+        self.registry_path = Path(registry_path)
+        self.delete_replaced = delete_replaced
+        self._store = JsonStore(self.registry_path, "agent registry")
+        self._lock = asyncio.Lock()
+
+    def forget(self, name: str, backend: str = "") -> None:
+        """Drop the registry entry for an agent, e.g. after deleting it."""
+        data = self._store.read()
+        if data.pop(registry_key(name, backend), None) is not None:
+            self._store.write(data)
+
+    async def get_or_create_agent(
+        self,
+        project_client: AIProjectClient,
+        model: str,
+        name: str,
+        instructions: str,
+        toolset: AsyncToolSet,
+        backend: str = "",
+        **settings: Any,
+    ) -> Agent:
+        """Return the registered agent when its definition is unchanged, otherwise create it.
+
+        ``backend`` names the data backend the agent serves, so one agent name
+        can be registered once per backend without the entries replacing each other.
+        """
+        fingerprint = agent_fingerprint(model, name, instructions, toolset, **settings)
+        key = registry_key(name, backend)
+        async with self._lock:
+            entry = self._store.read().get(key)
+            if entry and entry.get("fingerprint") == fingerprint:
+                try:
+                    agent = await project_client.agents.get_agent(entry["agent_id"])
+                    logger.debug("Reusing agent %s (%s).", key, agent.id)
+                    return agent
+                except ResourceNotFoundError:
+                    logger.info("Registered agent %s no longer exists; creating it again.", entry["agent_id"])
+
+            agent = await project_client.agents.create_agent(
+                model=model, name=name, instructions=instructions, toolset=toolset, **settings
+            )
+            if self.delete_replaced and entry and entry.get("agent_id") != agent.id:
+                await self._delete_stale(project_client, entry["agent_id"])
+
+            data = self._store.read()
+            data[key] = {"agent_id": agent.id, "fingerprint": fingerprint}
+            self._store.write(data)
+            return agent
+
+    async def _delete_stale(self, project_client: AIProjectClient, agent_id: str) -> None:
+        try:
+            await project_client.agents.delete_agent(agent_id)
+            logger.debug("Deleted replaced agent %s.", agent_id)
+        except ResourceNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Could not delete replaced agent %s: %s", agent_id, e)
@@ -1,10 +1,14 @@
 import os
+import asyncio
 import logging
+from typing import Optional
 import chainlit as cl
 from dotenv import load_dotenv
 from azure.identity.aio import DefaultAzureCredential
 from azure.ai.projects.aio import AIProjectClient
-from FinancialData import FinancialData
+from agent_registry import AGENT_REGISTRY_FILE, AgentRegistry
+from data_backend import BackendRegistry, configured_backend
+from fake_project_client import FakeProjectClient, fake_cache_root
 from stream_event_handler2 import StreamEventHandler2
 from terminal_colors import TerminalColors as tc
 from utilities import Utilities
@@ -30,34 +34,64 @@ MAX_COMPLETION_TOKENS = 10240
 MAX_PROMPT_TOKENS = 20480
 TEMPERATURE = 0.1
 TOP_P = 0.1
-INSTRUCTIONS_FILE = "instructions/code_interpreter.txt"
 
-project_client = AIProjectClient.from_connection_string(
-    conn_str=PROJECT_CONNECTION_STRING,
-    credential=DefaultAzureCredential(exclude_managed_identity_credential=True)
-)
-
-utilities = Utilities()
-FinancialData = FinancialData(utilities)
-
-
-async def setup_agent_and_thread() -> tuple[Agent, AgentThread]:
-    try:
+if os.getenv("FAKE_AGENT_SERVICE"):
+    # Offline stand-in for load testing and profiling, see fake_project_client.py
+    project_client = FakeProjectClient.from_env()
+    # Fake IDs are kept out of the real service's caches.
+    utilities = Utilities(cache_root=fake_cache_root())
+else:
+    project_client = AIProjectClient.from_connection_string(
+        conn_str=PROJECT_CONNECTION_STRING,
+        credential=DefaultAzureCredential(exclude_managed_identity_credential=True)
+    )
+    utilities = Utilities()
+
+# Data backends (SQLite, SQL Server) are shared by all chat sessions; DATA_BACKEND picks the default.
+backends = BackendRegistry(utilities)
+# Sessions share one agent per data backend, kept across restarts; each session still gets its own thread.
+# Replaced agents are not deleted because open sessions may still be using them.
+agent_registry = AgentRegistry(utilities.cache_root / AGENT_REGISTRY_FILE, delete_replaced=False)
+
+
+class SharedAgents:
+    """Application-lifetime agents, one per data backend, shared by all chat sessions.
+
+    The first session that asks for a backend connects its pool, builds the
+    schema digest, the vector store, the toolset and the agent; every later
+    session reuses them and only creates its own thread, so setup time and
+    memory per session stay constant.
+    """
+
+    def __init__(self) -> None:
+        self._agents: dict[str, tuple[Agent, AsyncFunctionTool]] = {}
+        # Tool functions of every backend created so far, see _enable_auto_function_calls.
+        self._functions: set = set()
+        self._lock = asyncio.Lock()
+
+    async def get(self, backend_name: Optional[str] = None) -> tuple[Agent, AsyncFunctionTool]:
+        name = backend_name or configured_backend()
+        shared = self._agents.get(name)
+        if shared is not None:
+            return shared
+        async with self._lock:
+            if name not in self._agents:
+                self._agents[name] = await self._create(name)
+            return self._agents[name]
+
+    async def _create(self, backend_name: str) -> tuple[Agent, AsyncFunctionTool]:
         toolset = AsyncToolSet()
 
-        await FinancialData.connect()
+        FinancialData = await backends.get(backend_name)
         db_schema = await FinancialData.get_database_info()
 
-        instructions = utilities.load_instructions(INSTRUCTIONS_FILE)
+        instructions = utilities.load_instructions(FinancialData.instructions_file)
         instructions = instructions.replace("{database_schema_string}", db_schema)
 
-        functions = AsyncFunctionTool({FinancialData.async_fetch_data_using_sqlite_query})
+        functions = AsyncFunctionTool(FinancialData.tool_functions())
         toolset.add(functions)
 
-        # Save functions in user session
-        cl.user_session.set("functions", functions)
-
-        # Add vector store
+        # Add vector store (uploaded and indexed once per document version)
         vs = await utilities.create_vector_store(
             project_client, [DATA_SHEET_FILE], "Contoso Vector"
         )
@@ -66,15 +100,43 @@ async def setup_agent_and_thread() -> tuple[Agent, AgentThread]:
         # Add code interpreter
         toolset.add(CodeInterpreterTool())
 
-        agent = await project_client.agents.create_agent(
+        agent = await agent_registry.get_or_create_agent(
+            project_client,
             name=AGENT_NAME,
             model=API_DEPLOYMENT_NAME,
             instructions=instructions,
             toolset=toolset,
+            backend=FinancialData.name,
             temperature=TEMPERATURE,
         )
 
+        self._functions |= FinancialData.tool_functions()
+        self._enable_auto_function_calls()
+        return agent, functions
+
+    def _enable_auto_function_calls(self) -> None:
+        # The client keeps a single function tool for automatic calls, so registering
+        # one backend's tool would replace the others'. Register all backends' functions.
+        toolset = AsyncToolSet()
+        toolset.add(AsyncFunctionTool(self._functions))
         project_client.agents.enable_auto_function_calls(toolset=toolset)
+
+    async def close(self) -> None:
+        self._agents.clear()
+        self._functions.clear()
+        await backends.close()
+
+
+shared_agents = SharedAgents()
+
+
+async def setup_agent_and_thread(backend_name: Optional[str] = None) -> tuple[Agent, AgentThread]:
+    try:
+        agent, functions = await shared_agents.get(backend_name)
+
+        # Save functions in user session
+        cl.user_session.set("functions", functions)
+
         thread = await project_client.agents.create_thread()
 
         return agent, thread
@@ -96,12 +158,36 @@ async def on_chat_start():
     await cl.Message(f"👋 Welcome! Agent `{agent.name}` is ready.").send()
 
 
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    # Close the shared data backends (connection pools) when the Chainlit server stops.
+    await shared_agents.close()
+
+
+@cl.on_chat_end
+async def on_chat_end():
+    # The agent and data backend are shared; only the session's thread goes away.
+    thread: AgentThread = cl.user_session.get("thread")
+    if thread:
+        try:
+            await project_client.agents.delete_thread(thread.id)
+        except Exception as e:
+            logging.warning(f"Could not delete thread {thread.id}: {e}")
+
+
 @cl.on_message
 async def on_message(message: cl.Message):
     agent: Agent = cl.user_session.get("agent")
     thread: AgentThread = cl.user_session.get("thread")
     functions = cl.user_session.get("functions")  # get functions from session
 
+    # The handler renders the answer (streamed text and images) and measures the turn
+    event_handler = StreamEventHandler2(
+        functions=functions,
+        project_client=project_client,
+        utilities=utilities
+    )
+
     # Create user message in backend
     await project_client.agents.create_message(
         thread_id=thread.id,
@@ -113,11 +199,7 @@ async def on_message(message: cl.Message):
     stream = await project_client.agents.create_stream(
         thread_id=thread.id,
         agent_id=agent.id,
-        event_handler=StreamEventHandler2(
-            functions=functions,
-            project_client=project_client,
-            utilities=utilities
-        ),
+        event_handler=event_handler,
         max_completion_tokens=MAX_COMPLETION_TOKENS,
         max_prompt_tokens=MAX_PROMPT_TOKENS,
         temperature=TEMPERATURE,
@@ -125,10 +207,10 @@ async def on_message(message: cl.Message):
         instructions=agent.instructions,
     )
 
-    full_response = ""
-
+    # Consume the events; all rendering happens in the handler, so each message is sent once
     async with stream as s:
-        async for event in s:
-            if hasattr(event, "content"):
-                full_response += event.content
-                await cl.Message(event.content).send()
+        await s.until_done()
+
+    metrics = event_handler.turn_metrics()
+    cl.user_session.set("turn_metrics", metrics)
+    utilities.log_msg_purple(f"\nTurn metrics: {metrics}")
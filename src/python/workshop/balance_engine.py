@@ -0,0 +1,85 @@
+"""Vectorized daily balance computation for sapbalance.
+
+Turns journal entries into one row per (book, entry date) with the daily
+change, journal count, last poster and running balance, using groupby and
+cumsum instead of per-row loops.
+
+Journal chunks must arrive ordered by book and then entry date, which is
+how the generators write them. A (book, date) group can be split across a
+chunk boundary, so the last group of every chunk is held back and merged
+into the next chunk. Running balances are carried across chunks per book.
+"""
+
+from typing import Iterable, Iterator, Mapping, Optional
+
+import pandas as pd
+
+BALANCE_COLUMNS = ["SAP_BOOK_ID", "DATE", "BALANCE", "DAILY_CHANGE", "TOTAL_JOURNALS", "LAST_UPDATED_BY"]
+_GROUP_KEYS = ["SAP_BOOK_ID", "ENTRY_DATE"]
+
+
+class BalanceEngine:
+    """Compute sapbalance rows from journal chunks, carrying state across chunks."""
+
+    def __init__(self, opening_balances: Mapping[str, int]) -> None:
+        self.balances = dict(opening_balances)
+        self._pending: Optional[pd.DataFrame] = None
+
+    def process_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Return the balance rows for every (book, date) group completed by this chunk."""
+        chunk = chunk[["SAP_BOOK_ID", "ENTRY_DATE", "VALUE", "POSTED_BY"]]
+        if self._pending is not None:
+            chunk = pd.concat([self._pending, chunk], ignore_index=True)
+            self._pending = None
+        if chunk.empty:
+            return pd.DataFrame(columns=BALANCE_COLUMNS)
+
+        # Hold back the trailing group: its rows may continue in the next chunk.
+        last_book = chunk["SAP_BOOK_ID"].iat[-1]
+        last_date = chunk["ENTRY_DATE"].iat[-1]
+        is_last = ((chunk["SAP_BOOK_ID"] == last_book) & (chunk["ENTRY_DATE"] == last_date)).to_numpy()
+        self._pending = chunk[is_last]
+        return self._aggregate(chunk[~is_last])
+
+    def flush(self) -> pd.DataFrame:
+        """Return the balance rows for the group held back from the last chunk."""
+        pending, self._pending = self._pending, None
+        if pending is None or pending.empty:
+            return pd.DataFrame(columns=BALANCE_COLUMNS)
+        return self._aggregate(pending)
+
+    def _aggregate(self, journals: pd.DataFrame) -> pd.DataFrame:
+        if journals.empty:
+            return pd.DataFrame(columns=BALANCE_COLUMNS)
+
+        daily = (
+            journals.groupby(_GROUP_KEYS, sort=False)
+            .agg(
+                DAILY_CHANGE=("VALUE", "sum"),
+                TOTAL_JOURNALS=("VALUE", "size"),
+                LAST_UPDATED_BY=("POSTED_BY", "last"),
+            )
+            .reset_index()
+            .rename(columns={"ENTRY_DATE": "DATE"})
+        )
+
+        # Running balance = carried balance of the book + cumulative daily change.
+        opening = daily["SAP_BOOK_ID"].map(self.balances).fillna(0)
+        daily["BALANCE"] = opening + daily.groupby("SAP_BOOK_ID", sort=False)["DAILY_CHANGE"].cumsum()
+        daily["BALANCE"] = daily["BALANCE"].astype("int64")
+
+        last = daily.drop_duplicates("SAP_BOOK_ID", keep="last")
+        self.balances.update(zip(last["SAP_BOOK_ID"], last["BALANCE"].tolist()))
+        return daily[BALANCE_COLUMNS]
+
+
+def compute_balances(chunks: Iterable[pd.DataFrame], opening_balances: Mapping[str, int]) -> Iterator[pd.DataFrame]:
+    """Yield balance frames for a stream of ordered journal chunks."""
+    engine = BalanceEngine(opening_balances)
+    for chunk in chunks:
+        balances = engine.process_chunk(chunk)
+        if not balances.empty:
+            yield balances
+    balances = engine.flush()
+    if not balances.empty:
+        yield balances
@@ -0,0 +1,219 @@
+"""Bulk loading of sapbooks, journaldata and sapbalance into SQLite.
+
+Loads run with the rollback journal and fsync turned off, insert large
+``executemany`` batches inside a single transaction and build the managed
+indexes once after the data is in, instead of maintaining them row by row.
+Every load reports its throughput in rows per second.
+
+Usage:
+    python bulk_loader.py --data-dir .                   # load sapbooks.csv, journaldata.csv, sapbalance.csv
+    python bulk_loader.py --data-dir . --format parquet  # load the .parquet files instead
+    python bulk_loader.py --data-dir . --journal-mode WAL
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from index_advisor import create_indexes, drop_indexes
+from ledger_parquet import iter_parquet
+
+logger = logging.getLogger(__name__)
+
+# The database the app (Utilities.shared_files_path) and the data generators use.
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "../../shared/database/financial_data.db")
+# Rows per executemany call and per CSV chunk.
+BULK_BATCH_ROWS = 100_000
+# Page cache for the load, in KiB (negative cache_size is KiB in SQLite).
+BULK_CACHE_KIB = 512 * 1024
+
+TABLE_SCHEMAS = {
+    "sapbooks": """CREATE TABLE IF NOT EXISTS sapbooks (
+    SAP_BOOK_ID TEXT PRIMARY KEY,
+    SAP_BOOK_NAME TEXT,
+    COST_CENTER TEXT,
+    SYSTEM_ENTITY TEXT,
+    SYSTEM TEXT,
+    OPENING_BALANCE INTEGER
+)""",
+    "journaldata": """CREATE TABLE IF NOT EXISTS journaldata (
+    SAP_BOOK_ID TEXT,
+    SAP_BOOK_NAME TEXT,
+    COST_CENTER TEXT,
+    TRANSACTION_CURRENCY TEXT,
+    VALUE INTEGER,
+    ENTRY_DATE TEXT,
+    POSTING_DATE TEXT,
+    USERNAME TEXT,
+    DOCUMENT_NUMBER TEXT PRIMARY KEY,
+    TRANSACTION_TYPE TEXT,
+    POSTED_BY TEXT,
+    APPROVED_BY TEXT,
+    CREATED_TIMESTAMP TEXT,
+    UPDATED_TIMESTAMP TEXT,
+    SOURCE_SYSTEM TEXT,
+    REMARKS TEXT
+)""",
+    "sapbalance": """CREATE TABLE IF NOT EXISTS sapbalance (
+    SAP_BOOK_ID TEXT,
+    DATE TEXT,
+    BALANCE INTEGER,
+    DAILY_CHANGE INTEGER,
+    TOTAL_JOURNALS INTEGER,
+    LAST_UPDATED_BY TEXT
+)""",
+}
+
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """Create sapbooks, journaldata and sapbalance if they are missing."""
+    for schema in TABLE_SCHEMAS.values():
+        conn.execute(schema)
+    conn.commit()
+
+
+@contextmanager
+def bulk_load_pragmas(conn: sqlite3.Connection, journal_mode: str = "OFF") -> Iterator[None]:
+    """Relax durability for the duration of a load and restore the settings afterwards.
+
+    With journal_mode OFF a crash during the load leaves the database
+    unusable; regenerate it. Use WAL to keep it recoverable.
+    """
+    conn.commit()
+    previous_journal_mode = conn.execute("PRAGMA journal_mode;").fetchone()[0]
+    previous_synchronous = conn.execute("PRAGMA synchronous;").fetchone()[0]
+    previous_cache_size = conn.execute("PRAGMA cache_size;").fetchone()[0]
+    conn.execute(f"PRAGMA journal_mode = {journal_mode};")
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute(f"PRAGMA cache_size = -{BULK_CACHE_KIB};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    try:
+        yield
+    finally:
+        conn.commit()
+        conn.execute(f"PRAGMA cache_size = {previous_cache_size};")
+        conn.execute(f"PRAGMA synchronous = {previous_synchronous};")
+        conn.execute(f"PRAGMA journal_mode = {previous_journal_mode};")
+
+
+def _frame_rows(frame: pd.DataFrame) -> Iterable[tuple]:
+    # pandas reads missing text as NaN; bind it as NULL.
+    missing = frame.isna()
+    columns_with_nulls = [column for column in frame.columns if missing[column].any()]
+    if columns_with_nulls:
+        frame = frame.copy()
+        for column in columns_with_nulls:
+            frame[column] = frame[column].astype(object).where(~missing[column], None)
+    return frame.itertuples(index=False, name=None)
+
+
+class BulkLoader:
+    """Insert DataFrame chunks into the ledger tables in one transaction per load."""
+
+    def __init__(self, conn: sqlite3.Connection, batch_rows: int = BULK_BATCH_ROWS) -> None:
+        self.conn = conn
+        self.batch_rows = batch_rows
+        self.stats = {}
+
+    def load_frames(self, table: str, frames: Iterable[pd.DataFrame], replace: bool = False) -> int:
+        """Insert every frame into the table and commit once. Returns the number of rows.
+
+        With ``replace`` rows whose primary key already exists replace the stored ones (INSERT OR REPLACE).
+        """
+        rows = 0
+        statement = "INSERT OR REPLACE" if replace else "INSERT"
+        start = time.perf_counter()
+        with self.conn:
+            for frame in frames:
+                for offset in range(0, len(frame), self.batch_rows):
+                    batch = frame.iloc[offset:offset + self.batch_rows]
+                    columns = ", ".join(batch.columns)
+                    placeholders = ", ".join("?" * len(batch.columns))
+                    self.conn.executemany(
+                        f"{statement} INTO {table} ({columns}) VALUES ({placeholders})", _frame_rows(batch)
+                    )
+                    rows += len(batch)
+        self._record(table, rows, time.perf_counter() - start)
+        return rows
+
+    def load_csv(self, table: str, path: str) -> int:
+        """Stream a CSV file into the table."""
+        return self.load_frames(table, pd.read_csv(path, chunksize=self.batch_rows))
+
+    def load_parquet(self, table: str, path: str) -> int:
+        """Stream a Parquet file into the table."""
+        return self.load_frames(table, iter_parquet(path, batch_rows=self.batch_rows))
+
+    def _record(self, table: str, rows: int, elapsed: float) -> None:
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        previous = self.stats.get(table, {"rows": 0, "seconds": 0.0})
+        total_rows, total_seconds = previous["rows"] + rows, previous["seconds"] + elapsed
+        self.stats[table] = {
+            "rows": total_rows,
+            "seconds": round(total_seconds, 3),
+            "rows_per_second": round(total_rows / total_seconds) if total_seconds > 0 else 0,
+        }
+        logger.info("Loaded %d rows into %s in %.1fs (%.0f rows/s)", rows, table, elapsed, rate)
+
+
+@contextmanager
+def bulk_load(conn: sqlite3.Connection, journal_mode: str = "OFF", batch_rows: int = BULK_BATCH_ROWS) -> Iterator[BulkLoader]:
+    """Prepare the database for a bulk load and build the indexes when it finishes.
+
+    Creates the tables, drops the managed indexes so inserts do not maintain
+    them, relaxes the pragmas, and recreates and ANALYZEs the indexes at the end.
+    """
+    create_tables(conn)
+    drop_indexes(conn)
+    loader = BulkLoader(conn, batch_rows)
+    with bulk_load_pragmas(conn, journal_mode):
+        yield loader
+        start = time.perf_counter()
+        create_indexes(conn)
+        logger.info("Built indexes in %.1fs", time.perf_counter() - start)
+
+
+def load_ledger_files(conn: sqlite3.Connection, data_dir: str, file_format: str = "csv", journal_mode: str = "OFF") -> dict:
+    """Bulk load sapbooks, journaldata and sapbalance from .csv or .parquet files. Returns the load stats."""
+    with bulk_load(conn, journal_mode) as loader:
+        for table in TABLE_SCHEMAS:
+            path = os.path.join(data_dir, f"{table}.{file_format}")
+            if file_format == "parquet":
+                loader.load_parquet(table, path)
+            else:
+                loader.load_csv(table, path)
+    return loader.stats
+
+
+def format_stats(stats: dict) -> str:
+    return "\n".join(
+        f"{table}: {s['rows']:,} rows in {s['seconds']:.1f}s ({s['rows_per_second']:,} rows/s)"
+        for table, s in stats.items()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk load the ledger files into SQLite.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the SQLite database.")
+    parser.add_argument("--data-dir", default=".", help="Directory containing the sapbooks, journaldata and sapbalance files.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Format of the ledger files.")
+    parser.add_argument("--journal-mode", default="OFF", choices=["OFF", "WAL"], help="Journal mode during the load.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    conn = sqlite3.connect(args.db)
+    try:
+        stats = load_ledger_files(conn, args.data_dir, args.format, args.journal_mode)
+        print(f"✅ Bulk load complete:\n{format_stats(stats)}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
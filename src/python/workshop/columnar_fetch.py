@@ -0,0 +1,227 @@
+"""Stream DB-API query results (pyodbc, sqlite3) as Arrow record batches.
+
+Rows are fetched ``arraysize`` at a time with ``fetchmany`` and transposed
+straight into typed Arrow columns, so only one batch of driver row objects
+is alive at a time. Batches can be turned into pandas or NumPy, or written
+to Parquet or CSV without materializing the whole result.
+
+Usage:
+    python columnar_fetch.py --db financial_data.db "SELECT * FROM sapbalance" sapbalance.parquet
+"""
+
+import argparse
+import datetime
+import decimal
+import logging
+import sqlite3
+from typing import Any, Collection, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+FETCH_ARRAYSIZE = 10_000
+EXPORT_COMPRESSION = "zstd"
+
+# Python types reported in cursor.description (pyodbc) -> Arrow types.
+_ARROW_TYPES = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+    bytes: pa.binary(),
+    bytearray: pa.binary(),
+    datetime.datetime: pa.timestamp("us"),
+    datetime.date: pa.date32(),
+    datetime.time: pa.time64("us"),
+}
+
+
+def _arrow_type(description: tuple) -> Optional[pa.DataType]:
+    type_code = description[1]
+    if type_code is decimal.Decimal:
+        precision, scale = description[4], description[5]
+        if precision and 0 < precision <= 38:
+            return pa.decimal128(precision, scale or 0)
+        return pa.float64()
+    return _ARROW_TYPES.get(type_code)
+
+
+def cursor_schema(cursor: Any, first_rows: Optional[list] = None) -> pa.Schema:
+    """Arrow schema of a cursor's result.
+
+    pyodbc reports column types in ``cursor.description``; drivers that do not
+    (sqlite3) have them inferred from the first batch, falling back to string
+    for columns that are entirely NULL. Inferred types are widened later if a
+    batch does not fit them, see rows_to_batch.
+    """
+    fields = []
+    columns = list(zip(*first_rows)) if first_rows else [()] * len(cursor.description)
+    for description, values in zip(cursor.description, columns):
+        arrow_type = _arrow_type(description)
+        if arrow_type is None:
+            arrow_type = _inferred_array(values, pa.null()).type if values else pa.null()
+            if pa.types.is_null(arrow_type):
+                arrow_type = pa.string()
+        fields.append(pa.field(description[0], arrow_type))
+    return pa.schema(fields)
+
+
+def _string_array(values: tuple) -> pa.Array:
+    # A column widened to string also holds the numbers stored in it.
+    return pa.array([value if value is None or isinstance(value, str) else str(value) for value in values], type=pa.string())
+
+
+def _inferred_array(values: tuple, arrow_type: pa.DataType) -> pa.Array:
+    """Array for a column without a reported type, widening arrow_type when the values do not fit it.
+
+    Integers mixed with floats widen to float64, any other mix to string.
+    """
+    if pa.types.is_string(arrow_type):
+        return _string_array(values)
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _string_array(values)
+    if pa.types.is_null(arrow_type) or pa.types.is_null(array.type) or array.type == arrow_type:
+        return array if pa.types.is_null(arrow_type) else array.cast(arrow_type)
+    numbers = (arrow_type, array.type)
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in numbers):
+        return array.cast(pa.float64())
+    return _string_array(values)
+
+
+def _inferred_columns(cursor: Any) -> set:
+    """Positions of the columns whose type the driver does not report."""
+    return {index for index, description in enumerate(cursor.description) if _arrow_type(description) is None}
+
+
+def rows_to_batch(rows: list, schema: pa.Schema, inferred: Collection[int] = ()) -> pa.RecordBatch:
+    """Transpose a fetchmany batch into an Arrow record batch.
+
+    SQLite lets one column hold values of different types. When the batch
+    does not fit the type of a column in ``inferred``, that column is widened
+    (see _inferred_array), so the batch's schema can be wider than ``schema``.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays, fields = [], []
+    for index, (values, field) in enumerate(zip(columns, schema)):
+        if index in inferred:
+            array = _inferred_array(values, field.type)
+            field = field.with_type(array.type)
+        else:
+            array = pa.array(values, type=field.type)
+        arrays.append(array)
+        fields.append(field)
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def iter_record_batches(
+    cursor: Any, arraysize: int = FETCH_ARRAYSIZE, schema: Optional[pa.Schema] = None
+) -> Iterator[pa.RecordBatch]:
+    """Yield the executed cursor's result as record batches of up to ``arraysize`` rows.
+
+    ``schema`` overrides the schema inferred from the first batch. A widened
+    column keeps its wider type in the following batches.
+    """
+    if cursor.description is None:
+        return
+    cursor.arraysize = arraysize
+    rows = cursor.fetchmany(arraysize)
+    if schema is None:
+        schema = cursor_schema(cursor, rows)
+    inferred = _inferred_columns(cursor)
+    while rows:
+        batch = rows_to_batch(rows, schema, inferred)
+        schema = batch.schema
+        yield batch
+        rows = cursor.fetchmany(arraysize)
+
+
+def iter_dataframes(cursor: Any, arraysize: int = FETCH_ARRAYSIZE) -> Iterator[pd.DataFrame]:
+    """Yield the result as DataFrames of up to ``arraysize`` rows."""
+    for batch in iter_record_batches(cursor, arraysize):
+        yield batch.to_pandas()
+
+
+def fetch_numpy(cursor: Any, arraysize: int = FETCH_ARRAYSIZE) -> dict:
+    """Fetch the whole result into one NumPy array per column."""
+    batches = list(iter_record_batches(cursor, arraysize))
+    if not batches:
+        return {}
+    # Columns only widen, so the last batch has the schema every batch fits.
+    schema = batches[-1].schema
+    table = pa.concat_tables(pa.Table.from_batches([batch]).cast(schema) for batch in batches)
+    return {name: column.to_numpy() for name, column in zip(table.column_names, table.columns)}
+
+
+def _open_writer(path: str, schema: pa.Schema, file_format: str) -> Any:
+    if file_format == "parquet":
+        return pq.ParquetWriter(path, schema, compression=EXPORT_COMPRESSION)
+    return pa_csv.CSVWriter(path, schema)
+
+
+def _export_pass(
+    conn: Any, query: str, path: str, file_format: str, arraysize: int, schema: Optional[pa.Schema]
+) -> tuple:
+    """Write the result with the given schema. Returns the row count and the wider schema if a column had to widen."""
+    cursor = conn.cursor()
+    cursor.execute(query)
+    rows = 0
+    writer = None
+    try:
+        for batch in iter_record_batches(cursor, arraysize, schema):
+            if writer is None:
+                writer, schema = _open_writer(path, batch.schema, file_format), batch.schema
+            elif batch.schema != schema:
+                return rows, batch.schema
+            writer.write_batch(batch)
+            rows += batch.num_rows
+        if writer is None and cursor.description is not None:
+            # Empty result: still write a file with the header / schema.
+            writer = _open_writer(path, cursor_schema(cursor), file_format)
+    finally:
+        if writer is not None:
+            writer.close()
+        cursor.close()
+    return rows, None
+
+
+def export_query(conn: Any, query: str, path: str, file_format: str = "parquet", arraysize: int = FETCH_ARRAYSIZE) -> int:
+    """Stream a query's result into a Parquet or CSV file. Returns the number of rows written.
+
+    The file's schema is fixed once the first batch is written. If a later
+    batch widens a column (mixed SQLite types), the query is run again and
+    the file rewritten with the wider schema.
+    """
+    schema = None
+    while True:
+        rows, widened = _export_pass(conn, query, path, file_format, arraysize, schema)
+        if widened is None:
+            return rows
+        logger.info("Column types of %s widened in a later batch; exporting it again.", path)
+        schema = widened
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a query result from a SQLite database to Parquet or CSV.")
+    parser.add_argument("--db", required=True, help="Path to the SQLite database.")
+    parser.add_argument("--arraysize", type=int, default=FETCH_ARRAYSIZE, help="Rows fetched per batch.")
+    parser.add_argument("query", help="SELECT statement to export.")
+    parser.add_argument("output", help="Output file (.parquet or .csv).")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        file_format = "csv" if args.output.endswith(".csv") else "parquet"
+        rows = export_query(conn, args.query, args.output, file_format, args.arraysize)
+        print(f"✅ Exported {rows:,} rows to {args.output}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 8
+# Idle connections older than this (seconds) are probed before being handed out.
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PooledConnection:
+    """An aiosqlite connection tracked by the pool."""
+
+    def __init__(self, conn: aiosqlite.Connection) -> None:
+        self.conn = conn
+        self.last_used = time.monotonic()
+        self.broken = False
+
+
+class SQLiteConnectionPool:
+    """Bounded pool of read-only aiosqlite connections.
+
+    aiosqlite runs every statement for a connection on that connection's own
+    background thread, so handing out one connection per query lets
+    concurrent sessions run their queries in parallel.
+    """
+
+    def __init__(
+        self,
+        db_uri: str,
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+        self.db_uri = db_uri
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self._idle: list[PooledConnection] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        # Metrics
+        self._acquisitions = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._health_check_failures = 0
+
+    async def _open_connection(self) -> PooledConnection:
+        conn = await aiosqlite.connect(self.db_uri, uri=True)
+        await conn.execute("PRAGMA query_only = ON;")
+        self._size += 1
+        logger.debug("Pool connection opened. Size: %d", self._size)
+        return PooledConnection(conn)
+
+    async def _discard(self, pooled: PooledConnection) -> None:
+        self._size -= 1
+        try:
+            await pooled.conn.close()
+        except aiosqlite.Error as e:
+            logger.debug("Error closing pool connection: %s", e)
+
+    async def _is_healthy(self, pooled: PooledConnection) -> bool:
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            async with pooled.conn.execute("SELECT 1;") as cursor:
+                await cursor.fetchone()
+            return True
+        except (aiosqlite.Error, ValueError) as e:
+            self._health_check_failures += 1
+            logger.warning("Pool connection failed health check: %s", e)
+            return False
+
+    async def open(self) -> None:
+        """Open the minimum number of connections."""
+        self._closed = False
+        while self._size < self.min_size:
+            self._idle.append(await self._open_connection())
+
+    async def close(self) -> None:
+        """Close all idle connections. Connections in use are closed on release."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._discard(pooled)
+        logger.debug("Connection pool closed.")
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Check a connection out of the pool for the duration of the block."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        wait = time.perf_counter() - start
+        self._acquisitions += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+        pooled: Optional[PooledConnection] = None
+        try:
+            while self._idle and pooled is None:
+                candidate = self._idle.pop()
+                if await self._is_healthy(candidate):
+                    pooled = candidate
+                else:
+                    await self._discard(candidate)
+            if pooled is None:
+                pooled = await self._open_connection()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        self._in_use += 1
+        try:
+            yield pooled.conn
+        except aiosqlite.OperationalError:
+            # The connection itself is usually fine, but re-check it before reuse.
+            pooled.last_used = 0.0
+            raise
+        except ValueError:
+            # aiosqlite raises ValueError once its worker thread has stopped.
+            pooled.broken = True
+            raise
+        finally:
+            self._in_use -= 1
+            if pooled.last_used:
+                pooled.last_used = time.monotonic()
+            if self._closed or pooled.broken:
+                await self._discard(pooled)
+            else:
+                self._idle.append(pooled)
+            self._semaphore.release()
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the pool metrics."""
+        return {
+            "size": self._size,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "acquisitions": self._acquisitions,
+            "total_wait_seconds": round(self._total_wait, 6),
+            "avg_wait_seconds": round(self._total_wait / self._acquisitions, 6) if self._acquisitions else 0.0,
+            "max_wait_seconds": round(self._max_wait, 6),
+            "health_check_failures": self._health_check_failures,
+        }
@@ -1,5 +1,8 @@
 import pandas as pd
 import pyodbc
+
+from columnar_fetch import export_query
+from ledger_parquet import iter_parquet
  
 # Set up the connection details
 server = "mitr.database.windows.net"
@@ -27,17 +30,17 @@ except pyodbc.Error as e:
     print(f"❌ Error connecting to SQL Server: {e}")
     exit()
  
-# Query the SAPBALANCE table
-query = "SELECT * FROM sapbalance"
-query_sapooks = "SELECT * FROM sapbooks"
+# Export the SAPBALANCE and SAPBOOKS tables to Parquet, streaming fetchmany
+# batches into Arrow columns instead of materializing everything with pd.read_sql
+queries = {
+    "sapbalance": "SELECT * FROM sapbalance",
+    "sapbooks": "SELECT * FROM sapbooks",
+}
 try:
-    df = pd.read_sql(query, conn)
-    print("✅ Data fetched successfully from SAPBALANCE table.")
-    print(df.head())  # Display the first few rows of the data
- 
-    df_sapbooks = pd.read_sql(query_sapooks, conn)
-    print("✅ Data fetched successfully from SAPBOOKS table.")  
-    print(df_sapbooks.head())  # Display the first few rows of the data
+    for table, query in queries.items():
+        rows = export_query(conn, query, f"{table}.parquet")
+        print(f"✅ Data fetched successfully from {table.upper()} table ({rows} rows) into {table}.parquet.")
+        print(next(iter_parquet(f"{table}.parquet", batch_rows=5), pd.DataFrame()))  # Display the first few rows of the data
 except Exception as e:
     print(f"❌ Error fetching data: {e}")
  
@@ -0,0 +1,210 @@
+import asyncio
+import importlib
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Optional
+
+from query_cache import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, QueryResultCache
+from result_serializer import FETCH_BATCH_SIZE, RESULT_MAX_BYTES, RESULT_MAX_ROWS
+from rollups import ROLLUPS
+from terminal_colors import TerminalColors as tc
+from utilities import Utilities
+
+logger = logging.getLogger(__name__)
+
+# Backend used when the DATA_BACKEND environment variable is not set.
+DEFAULT_DATA_BACKEND = "sqlite"
+QUERY_TIMEOUT_SECONDS = 30.0
+# Number of SQLite VM instructions between deadline checks (sqlite3 progress handler).
+PROGRESS_HANDLER_STEPS = 10_000
+# Maximum number of introspection queries get_database_info runs at once.
+INTROSPECTION_CONCURRENCY = 4
+
+# Backend name -> (module, class). Modules are imported on first use, so a
+# backend's driver (aiosqlite, pyodbc) is only needed when it is selected.
+BACKENDS = {
+    "sqlite": ("FinancialData", "FinancialData"),
+    "sqlserver": ("FinancialDataSQLServer", "FinancialDataSQLServer"),
+}
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query is interrupted before returning any rows."""
+
+
+class DataBackend(ABC):
+    """Query path shared by the agent's data backends.
+
+    The base class owns the result cache, the result limits, the
+    introspection concurrency limit, error reporting and the schema text
+    given to the agent. A backend must implement the abstract methods:
+    connect/close, ``tool_functions``, ``_execute`` (run one query under the
+    limits) and ``_get_schema_digest``, and exposes its tool function under
+    the name its instructions file refers to.
+    """
+
+    name = ""
+    instructions_file = ""
+    error_key = "SQL query failed"
+
+    def __init__(
+        self: "DataBackend",
+        utilities: Utilities,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = CACHE_MAX_BYTES,
+        cache_ttl: float = CACHE_TTL_SECONDS,
+        fetch_batch_size: int = FETCH_BATCH_SIZE,
+        result_max_bytes: int = RESULT_MAX_BYTES,
+        result_max_rows: int = RESULT_MAX_ROWS,
+        query_timeout: float = QUERY_TIMEOUT_SECONDS,
+    ) -> None:
+        self.utilities = utilities
+        self.cache = QueryResultCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes, ttl=cache_ttl)
+        self.fetch_batch_size = fetch_batch_size
+        self.result_max_bytes = result_max_bytes
+        self.result_max_rows = result_max_rows
+        self.query_timeout = query_timeout
+        self._introspection_limit = asyncio.Semaphore(INTROSPECTION_CONCURRENCY)
+
+    @abstractmethod
+    async def connect(self: "DataBackend") -> None: ...
+
+    @abstractmethod
+    async def close(self: "DataBackend") -> None: ...
+
+    @abstractmethod
+    def tool_functions(self: "DataBackend") -> set:
+        """The async functions to register with AsyncFunctionTool."""
+
+    def pool_metrics(self: "DataBackend") -> dict:
+        return {}
+
+    def cache_stats(self: "DataBackend") -> dict:
+        return self.cache.stats()
+
+    def _data_version(self: "DataBackend") -> Optional[Any]:
+        """Change marker for the data, or None when the backend cannot tell (results are not cached)."""
+        return None
+
+    @abstractmethod
+    async def _execute(self: "DataBackend", query: str) -> tuple:
+        """Run a query under the row, byte and time limits.
+
+        Returns the serialized result and whether it is complete (not cut short by the timeout).
+        """
+
+    @abstractmethod
+    async def _get_schema_digest(self: "DataBackend", refresh: bool = False) -> dict:
+        """Return {"tables": {name: {"column_names": [...]}}, "journal_values": {...}, "rollups": [...]}."""
+
+    async def _limited(self: "DataBackend", coro: Awaitable) -> Any:
+        async with self._introspection_limit:
+            return await coro
+
+    async def fetch_data(self: "DataBackend", tool_name: str, query: str) -> str:
+        """Run a tool query, serving repeated queries from the result cache."""
+        print(f"\n{tc.BLUE}Function Call: {tool_name}{tc.RESET}")
+        print(f"{tc.BLUE}Executing query: {query}{tc.RESET}\n")
+
+        data_version = self._data_version()
+        if data_version is not None:
+            cached = self.cache.get(query, data_version)
+            if cached is not None:
+                return cached
+
+        try:
+            result, complete = await self._execute(query)
+        except QueryTimeoutError:
+            return json.dumps({self.error_key: f"Query exceeded the {self.query_timeout}s time limit.", "query": query})
+        except Exception as e:
+            return json.dumps({self.error_key: str(e), "query": query})
+
+        if complete and data_version is not None:
+            self.cache.put(query, result, data_version)
+        return result
+
+    async def get_database_info(self: "DataBackend", refresh: bool = False) -> str:
+        """Get the schema information the agent instructions are built from."""
+        digest = await self._get_schema_digest(refresh)
+
+        database_info = "\n".join(
+            [
+                f"Table {table_name} Schema: Columns: {', '.join(table['column_names'])}"
+                for table_name, table in digest["tables"].items()
+            ]
+        )
+        journal_values = digest["journal_values"]
+
+        database_info += f"\nTransaction Types: {', '.join(journal_values['transaction_types'])}"
+        database_info += f"\nCurrencies: {', '.join(journal_values['currencies'])}"
+        database_info += f"\nYears: {', '.join(map(str, journal_values['years']))}"
+        if digest.get("rollups"):
+            rollups = "; ".join(f"{table_name}: {ROLLUPS[table_name][2]}" for table_name in digest["rollups"])
+            database_info += (
+                "\nPre-aggregated tables (prefer these over journaldata for monthly or yearly totals, "
+                f"counts, minimums and maximums): {rollups}"
+            )
+        database_info += "\n\n"
+
+        return database_info
+
+
+def configured_backend() -> str:
+    """Name of the backend selected by the DATA_BACKEND environment variable."""
+    return os.getenv("DATA_BACKEND", DEFAULT_DATA_BACKEND)
+
+
+def register_backend(name: str, module: str, class_name: str) -> None:
+    """Make a DataBackend subclass selectable by name."""
+    BACKENDS[name] = (module, class_name)
+
+
+def backend_class(name: str) -> type:
+    try:
+        module, class_name = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown data backend {name!r}. Choose one of: {', '.join(sorted(BACKENDS))}") from None
+    return getattr(importlib.import_module(module), class_name)
+
+
+def create_backend(name: str, utilities: Utilities, **kwargs: Any) -> DataBackend:
+    """Instantiate the backend registered under name."""
+    return backend_class(name)(utilities, **kwargs)
+
+
+class BackendRegistry:
+    """Connected backends shared by all sessions of a process, created on first use.
+
+    Sessions ask for a backend by name, so one process can serve sessions
+    against different backends while each backend keeps a single pool and cache.
+    """
+
+    def __init__(self, utilities: Utilities) -> None:
+        self.utilities = utilities
+        self._backends: dict[str, DataBackend] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, name: Optional[str] = None) -> DataBackend:
+        name = name or configured_backend()
+        backend = self._backends.get(name)
+        if backend is not None:
+            return backend
+        async with self._lock:
+            if name not in self._backends:
+                backend = create_backend(name, self.utilities)
+                await backend.connect()
+                self._backends[name] = backend
+            return self._backends[name]
+
+    async def close(self) -> None:
+        backends, self._backends = self._backends, {}
+        for backend in backends.values():
+            await backend.close()
+
+    def metrics(self) -> dict:
+        return {
+            name: {"pool": backend.pool_metrics(), "cache": backend.cache_stats()}
+            for name, backend in self._backends.items()
+        }
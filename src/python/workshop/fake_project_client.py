@@ -0,0 +1,450 @@
+"""Offline stand-in for the Azure AI Foundry agent service.
+
+FakeProjectClient implements the ``project_client.agents`` calls used by
+main.py, app.py, the stream handlers and Utilities: agents, threads,
+messages, streamed runs with scripted replies and function tool calls,
+file upload/download and vector stores. Every call sleeps for a
+configurable, jittered latency instead of going over the network, so our
+own overhead (tool calls, database queries, serialization, rendering) can
+be load-tested and profiled on one machine.
+
+Set FAKE_AGENT_SERVICE=1 to run main.py or app.py against it
+(FAKE_AGENT_LATENCY_SCALE scales every delay, 0 disables them; the agent,
+upload and file caches then live in a temporary directory), or drive it
+directly:
+
+    python fake_project_client.py --sessions 50 --turns 3 "SELECT COUNT(*) FROM journaldata"
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from azure.ai.projects.models import AsyncFunctionTool, AsyncToolSet
+from azure.core.exceptions import ResourceNotFoundError
+
+# Characters per streamed token in scripted replies.
+FAKE_TOKEN_CHARS = 4
+FAKE_REPLY_TOKENS = 60
+FAKE_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Statements the default script sends to the first function tool instead of answering in text.
+QUERY_PREFIXES = ("select", "with")
+
+
+class FakeLatency:
+    """Simulated service latencies in seconds, each with +/- ``jitter`` relative noise."""
+
+    def __init__(
+        self,
+        api: float = 0.05,
+        first_token: float = 0.4,
+        token: float = 0.015,
+        tool_round_trip: float = 0.3,
+        vector_store: float = 2.0,
+        bytes_per_second: float = 20e6,
+        jitter: float = 0.2,
+        scale: float = 1.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.api = api
+        self.first_token = first_token
+        self.token = token
+        self.tool_round_trip = tool_round_trip
+        self.vector_store = vector_store
+        self.bytes_per_second = bytes_per_second
+        self.jitter = jitter
+        self.scale = scale
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "FakeLatency":
+        return cls(scale=float(os.getenv("FAKE_AGENT_LATENCY_SCALE", "1.0")))
+
+    def seconds(self, base: float) -> float:
+        return max(0.0, base * self.scale * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+    async def sleep(self, base: float) -> None:
+        delay = self.seconds(base)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def transfer(self, size: int) -> None:
+        await self.sleep(self.api + size / self.bytes_per_second)
+
+
+def fake_cache_root() -> Path:
+    """Temporary root for the agent, upload and file caches of a run against the fake.
+
+    Fake IDs only exist in the process that created them, so they must not be
+    written to (or evict entries from) the caches of the real service.
+    """
+    return Path(tempfile.mkdtemp(prefix="fake-agent-cache-"))
+
+
+def _tokens(text: str) -> list[str]:
+    return [text[i : i + FAKE_TOKEN_CHARS] for i in range(0, len(text), FAKE_TOKEN_CHARS)]
+
+
+def default_script(content: str, functions: list[dict]) -> list[dict]:
+    """Scripted reply for a user message.
+
+    A message that is a SQL statement is run through the first function tool
+    (its first parameter gets the statement) and the reply quotes the result;
+    anything else gets a fixed-length text reply.
+    """
+    if functions and content.strip().lower().startswith(QUERY_PREFIXES):
+        function = functions[0]
+        return [
+            {"type": "tool_call", "name": function["name"], "arguments": {function["parameters"][0]: content.strip()}},
+            {"type": "text", "text": "Here is what the query returned:\n{tool_output}"},
+        ]
+    words = itertools.islice(itertools.cycle("the ledger balance moved as expected for this book".split()), FAKE_REPLY_TOKENS)
+    return [{"type": "text", "text": " ".join(words) + "."}]
+
+
+class FakeAgentStream:
+    """Scripted run, consumed like the SDK's AsyncAgentRunStream."""
+
+    def __init__(self, agents: "FakeAgents", thread_id: str, agent_id: str, event_handler: Any) -> None:
+        self.agents = agents
+        self.thread_id = thread_id
+        self.agent_id = agent_id
+        self.event_handler = event_handler
+
+    async def __aenter__(self) -> "FakeAgentStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def until_done(self) -> None:
+        async for _ in self:
+            pass
+
+    async def _emit(self, event_type: str, data: Any) -> tuple:
+        handler = getattr(self.event_handler, f"on_{event_type}", None) if self.event_handler else None
+        if handler is not None:
+            await handler(*(() if data is None else (data,)))
+        return event_type, data, None
+
+    async def __aiter__(self):
+        agents = self.agents
+        run = SimpleNamespace(
+            id=agents._new_id("run"), thread_id=self.thread_id, agent_id=self.agent_id, status="in_progress", last_error=None
+        )
+        yield await self._emit("thread_run", run)
+
+        content = agents._threads[self.thread_id][-1]["content"]
+        steps = agents.script(content, agents._function_definitions())
+        tool_output = ""
+        for step in steps:
+            if step["type"] == "tool_call":
+                await agents.latency.sleep(agents.latency.tool_round_trip)
+                tool_output = await agents._call_function(step["name"], step["arguments"])
+                yield await self._emit("run_step", SimpleNamespace(id=agents._new_id("step"), type="tool_calls", status="completed"))
+            elif step["type"] == "text":
+                text = step["text"].replace("{tool_output}", tool_output)
+                await agents.latency.sleep(agents.latency.first_token)
+                for token in _tokens(text):
+                    await agents.latency.sleep(agents.latency.token)
+                    yield await self._emit("message_delta", SimpleNamespace(text=token))
+                yield await self._emit("thread_message", agents._add_message(self.thread_id, "assistant", text))
+            elif step["type"] == "image":
+                file_info = agents._store_file(step.get("name", "chart.png"), step["data"], "assistants_output")
+                message = agents._add_message(self.thread_id, "assistant", "")
+                message.image_contents = [SimpleNamespace(image_file=SimpleNamespace(file_id=file_info.id))]
+                yield await self._emit("thread_message", message)
+
+        run.status = "completed"
+        yield await self._emit("thread_run", run)
+        yield await self._emit("done", None)
+
+
+class FakeAgents:
+    """The ``project_client.agents`` surface, kept in memory."""
+
+    def __init__(self, latency: FakeLatency, script: Callable[[str, list[dict]], list[dict]]) -> None:
+        self.latency = latency
+        self.script = script
+        self._agents: dict[str, Any] = {}
+        self._threads: dict[str, list] = {}
+        self._files: dict[str, Any] = {}
+        self._contents: dict[str, bytes] = {}
+        self._vector_stores: dict[str, Any] = {}
+        self._toolset: Optional[AsyncToolSet] = None
+        self.calls: dict[str, int] = {}
+
+    def _new_id(self, prefix: str) -> str:
+        # Unique across runs: the local upload, agent and file caches are keyed by these IDs,
+        # so reused IDs would let one run's cache entries serve the next run.
+        return f"{prefix}_fake{uuid.uuid4().hex}"
+
+    async def _api(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await self.latency.sleep(self.latency.api)
+
+    def _function_tool(self) -> Optional[AsyncFunctionTool]:
+        if self._toolset is None:
+            return None
+        try:
+            return self._toolset.get_tool(AsyncFunctionTool)
+        except ValueError:
+            return None
+
+    def _function_definitions(self) -> list[dict]:
+        tool = self._function_tool()
+        if tool is None:
+            return []
+        return [
+            {
+                "name": definition.function.name,
+                "parameters": list(definition.function.parameters.get("properties", {})),
+            }
+            for definition in tool.definitions
+        ]
+
+    async def _call_function(self, name: str, arguments: dict) -> str:
+        tool = self._function_tool()
+        if tool is None:
+            return json.dumps({"error": f"No function tool registered for {name}."})
+        tool_call = SimpleNamespace(
+            id=self._new_id("call"), type="function", function=SimpleNamespace(name=name, arguments=json.dumps(arguments))
+        )
+        return str(await tool.execute(tool_call))
+
+    def _add_message(self, thread_id: str, role: str, content: str) -> Any:
+        self._threads[thread_id].append({"role": role, "content": content})
+        return SimpleNamespace(
+            id=self._new_id("msg"),
+            thread_id=thread_id,
+            role=role,
+            status="completed",
+            content=[{"type": "text", "text": {"value": content, "annotations": []}}],
+            image_contents=[],
+            attachments=[],
+            file_path_annotations=[],
+        )
+
+    def _store_file(self, filename: str, data: bytes, purpose: str) -> Any:
+        file_info = SimpleNamespace(
+            id=self._new_id("assistant"), filename=filename, bytes=len(data), purpose=purpose, status="processed"
+        )
+        self._files[file_info.id] = file_info
+        self._contents[file_info.id] = data
+        return file_info
+
+    # Agents
+
+    async def create_agent(self, model: str, name: str, instructions: str = "", toolset: Optional[AsyncToolSet] = None, **settings: Any) -> Any:
+        await self._api("create_agent")
+        agent = SimpleNamespace(id=self._new_id("asst"), model=model, name=name, instructions=instructions, settings=settings)
+        self._agents[agent.id] = agent
+        if toolset is not None and self._toolset is None:
+            self._toolset = toolset
+        return agent
+
+    async def get_agent(self, agent_id: str) -> Any:
+        await self._api("get_agent")
+        if agent_id not in self._agents:
+            raise ResourceNotFoundError(f"No agent {agent_id}.")
+        return self._agents[agent_id]
+
+    async def delete_agent(self, agent_id: str) -> None:
+        await self._api("delete_agent")
+        self._agents.pop(agent_id, None)
+
+    def enable_auto_function_calls(self, toolset: AsyncToolSet) -> None:
+        self._toolset = toolset
+
+    # Threads, messages and runs
+
+    async def create_thread(self) -> Any:
+        await self._api("create_thread")
+        thread = SimpleNamespace(id=self._new_id("thread"))
+        self._threads[thread.id] = []
+        return thread
+
+    async def delete_thread(self, thread_id: str) -> None:
+        await self._api("delete_thread")
+        self._threads.pop(thread_id, None)
+
+    async def create_message(self, thread_id: str, role: str, content: str) -> Any:
+        await self._api("create_message")
+        if thread_id not in self._threads:
+            raise ResourceNotFoundError(f"No thread {thread_id}.")
+        return self._add_message(thread_id, role, content)
+
+    async def create_stream(self, thread_id: str, agent_id: str, event_handler: Any = None, **settings: Any) -> FakeAgentStream:
+        await self._api("create_stream")
+        if thread_id not in self._threads:
+            raise ResourceNotFoundError(f"No thread {thread_id}.")
+        return FakeAgentStream(self, thread_id, agent_id, event_handler)
+
+    # Files and vector stores
+
+    async def upload_file(self, file_path: Path, purpose: str = "assistants") -> Any:
+        data = await asyncio.to_thread(Path(file_path).read_bytes)
+        self.calls["upload_file"] = self.calls.get("upload_file", 0) + 1
+        await self.latency.transfer(len(data))
+        return self._store_file(Path(file_path).name, data, purpose)
+
+    async def get_file(self, file_id: str) -> Any:
+        await self._api("get_file")
+        if file_id not in self._files:
+            raise ResourceNotFoundError(f"No file {file_id}.")
+        return self._files[file_id]
+
+    async def list_files(self) -> Any:
+        await self._api("list_files")
+        return SimpleNamespace(data=list(self._files.values()))
+
+    async def delete_file(self, file_id: str) -> None:
+        await self._api("delete_file")
+        self._files.pop(file_id, None)
+        self._contents.pop(file_id, None)
+
+    async def get_file_content(self, file_id: str) -> Any:
+        await self._api("get_file_content")
+        if file_id not in self._contents:
+            raise ResourceNotFoundError(f"No file {file_id}.")
+        data = self._contents[file_id]
+
+        async def chunks():
+            for offset in range(0, len(data), FAKE_DOWNLOAD_CHUNK_BYTES):
+                chunk = data[offset : offset + FAKE_DOWNLOAD_CHUNK_BYTES]
+                await self.latency.sleep(len(chunk) / self.latency.bytes_per_second)
+                yield chunk
+
+        return chunks()
+
+    async def create_vector_store_and_poll(self, file_ids: list[str], name: str) -> Any:
+        await self._api("create_vector_store_and_poll")
+        await self.latency.sleep(self.latency.vector_store)
+        vector_store = SimpleNamespace(
+            id=self._new_id("vs"),
+            name=name,
+            status="completed",
+            file_ids=list(file_ids),
+            file_counts=SimpleNamespace(completed=len(file_ids), failed=0, in_progress=0),
+        )
+        self._vector_stores[vector_store.id] = vector_store
+        return vector_store
+
+    async def get_vector_store(self, vector_store_id: str) -> Any:
+        await self._api("get_vector_store")
+        if vector_store_id not in self._vector_stores:
+            raise ResourceNotFoundError(f"No vector store {vector_store_id}.")
+        return self._vector_stores[vector_store_id]
+
+
+class FakeProjectClient:
+    """Drop-in for AIProjectClient where only ``agents`` is used."""
+
+    def __init__(
+        self,
+        latency: Optional[FakeLatency] = None,
+        script: Callable[[str, list[dict]], list[dict]] = default_script,
+    ) -> None:
+        self.agents = FakeAgents(latency or FakeLatency(), script)
+
+    @classmethod
+    def from_env(cls) -> "FakeProjectClient":
+        return cls(latency=FakeLatency.from_env())
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "FakeProjectClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class TurnRecorder:
+    """Minimal event handler for load tests: records latency and output size per turn."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.tokens = 0
+        self.chars = 0
+
+    async def on_message_delta(self, delta: Any) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+        self.chars += len(delta.text)
+
+
+async def run_load(query: str, sessions: int, turns: int, latency_scale: float) -> dict:
+    """Run concurrent sessions of scripted turns against the configured data backend."""
+    from data_backend import configured_backend, create_backend
+    from utilities import Utilities
+
+    backend = create_backend(configured_backend(), Utilities())
+    await backend.connect()
+    project_client = FakeProjectClient(latency=FakeLatency(scale=latency_scale))
+    toolset = AsyncToolSet()
+    toolset.add(AsyncFunctionTool(backend.tool_functions()))
+    agent = await project_client.agents.create_agent(model="fake", name="load-test", toolset=toolset)
+
+    turn_seconds, first_token_seconds = [], []
+
+    async def session() -> None:
+        thread = await project_client.agents.create_thread()
+        for _ in range(turns):
+            recorder = TurnRecorder()
+            await project_client.agents.create_message(thread_id=thread.id, role="user", content=query)
+            stream = await project_client.agents.create_stream(thread_id=thread.id, agent_id=agent.id, event_handler=recorder)
+            async with stream as s:
+                await s.until_done()
+            turn_seconds.append(time.perf_counter() - recorder.started)
+            if recorder.first_token_at is not None:
+                first_token_seconds.append(recorder.first_token_at - recorder.started)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(session() for _ in range(sessions)))
+    finally:
+        await backend.close()
+    elapsed = time.perf_counter() - start
+
+    def percentile(values: list, q: float) -> float:
+        return round(statistics.quantiles(values, n=100)[int(q) - 1], 3) if len(values) > 1 else round(sum(values), 3)
+
+    return {
+        "turns": len(turn_seconds),
+        "seconds": round(elapsed, 3),
+        "turns_per_second": round(len(turn_seconds) / elapsed, 2) if elapsed else 0.0,
+        "turn_p50_seconds": percentile(turn_seconds, 50),
+        "turn_p95_seconds": percentile(turn_seconds, 95),
+        "first_token_p50_seconds": percentile(first_token_seconds, 50),
+        "backend": {"pool": backend.pool_metrics(), "cache": backend.cache_stats()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the agent tool path against the offline fake agent service.")
+    parser.add_argument("query", help="SQL statement every turn sends through the backend's function tool.")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent sessions.")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per session.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for the simulated service latencies (0 = none).")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args.query, args.sessions, args.turns, args.latency_scale))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from json_store import JsonStore
+
+logger = logging.getLogger(__name__)
+
+FILE_CACHE_INDEX = "cache/file_cache.json"
+FILE_CACHE_DIR = "cache/files"
+FILE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+class FileCache:
+    """Local cache of files downloaded from the agent service.
+
+    Content is stored once per SHA-256 in ``blob_dir``. The index maps each
+    file ID to its content hash and to the named copies written for it
+    (hard links where the file system allows), so a file ID that was already
+    downloaded, by this or another session or before a restart, is served
+    from disk. When the stored content exceeds ``max_bytes`` the least
+    recently used content is evicted. Eviction only removes what the cache
+    owns (the blob and its index entries); the named copies are the user's
+    files and stay where they were written.
+
+    Methods touch the file system and are meant to be called through
+    ``asyncio.to_thread``; the index is guarded by a thread lock.
+    """
+
+    def __init__(self, index_path: Path, blob_dir: Path, max_bytes: int = FILE_CACHE_MAX_BYTES) -> None:
+        self.index_path = Path(index_path)
+        self._store = JsonStore(self.index_path, "file cache index")
+        self.blob_dir = Path(blob_dir)
+        self.max_bytes = max_bytes
+        self._index: Optional[dict] = None
+        self._mutex = threading.Lock()
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _read_index(self) -> dict:
+        data = self._store.read()
+        if isinstance(data.get("files"), dict) and isinstance(data.get("blobs"), dict):
+            return data
+        return {"files": {}, "blobs": {}}
+
+    def _write_index(self) -> None:
+        self._store.write(self._index)
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256
+
+    def lock(self, file_id: str) -> asyncio.Lock:
+        """Per-file lock, so concurrent requests for one file ID download it once."""
+        return self._locks.setdefault(file_id, asyncio.Lock())
+
+    @staticmethod
+    def _materialize(blob_path: Path, target: Path) -> None:
+        """Make target a copy of the blob, preferring a hard link."""
+        if target.exists() and os.path.samefile(blob_path, target):
+            return
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, target)
+
+    def get(self, file_id: str, target: Path) -> bool:
+        """Write the cached content of file_id to target. Returns False on a cache miss."""
+        with self._mutex:
+            entry = self.index["files"].get(file_id)
+            blob = self.index["blobs"].get(entry["sha256"]) if entry else None
+            blob_path = self._blob_path(entry["sha256"]) if entry else None
+            if blob is None or not blob_path.is_file() or blob_path.stat().st_size != blob["size"]:
+                if entry is not None:
+                    self._drop_blob(entry["sha256"])
+                self._misses += 1
+                return False
+
+            self._materialize(blob_path, target)
+            if str(target) not in entry["paths"]:
+                entry["paths"].append(str(target))
+            blob["last_used"] = time.time()
+            self._hits += 1
+            self._write_index()
+            return True
+
+    def put(self, file_id: str, tmp_path: Path, sha256: str, size: int, target: Path) -> None:
+        """Store a downloaded temporary file as file_id's content and write it to target."""
+        with self._mutex:
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            blob_path = self._blob_path(sha256)
+            if blob_path.is_file():
+                # Same content under another file ID: keep the stored copy.
+                tmp_path.unlink(missing_ok=True)
+            else:
+                os.replace(tmp_path, blob_path)
+            self._materialize(blob_path, target)
+
+            self.index["blobs"][sha256] = {"size": size, "last_used": time.time()}
+            entry = self.index["files"].setdefault(file_id, {"sha256": sha256, "paths": []})
+            entry["sha256"] = sha256
+            if str(target) not in entry["paths"]:
+                entry["paths"].append(str(target))
+            self._evict(keep=sha256)
+            self._write_index()
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used content until the cache fits in max_bytes."""
+        blobs = self.index["blobs"]
+        total = sum(blob["size"] for blob in blobs.values())
+        for sha256, blob in sorted(blobs.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            total -= blob["size"]
+            self._drop_blob(sha256)
+            self._evictions += 1
+
+    def _drop_blob(self, sha256: str) -> None:
+        """Remove content and the file IDs pointing to it, leaving their named copies in place."""
+        self.index["blobs"].pop(sha256, None)
+        self._blob_path(sha256).unlink(missing_ok=True)
+        for file_id, entry in list(self.index["files"].items()):
+            if entry["sha256"] == sha256:
+                del self.index["files"][file_id]
+
+    def stats(self) -> dict:
+        """Return a snapshot of the cache metrics."""
+        with self._mutex:
+            blobs = self.index["blobs"]
+            return {
+                "files": len(self.index["files"]),
+                "blobs": len(blobs),
+                "bytes": sum(blob["size"] for blob in blobs.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,113 @@
+"""Index management for the financial SQLite database.
+
+Creates covering indexes for the access patterns the agent uses (filter and
+group by book, entry date, year and transaction type) and reports full table
+scans in query plans.
+
+Usage:
+    python index_advisor.py                      # create missing indexes and ANALYZE
+    python index_advisor.py --drop               # drop the managed indexes
+    python index_advisor.py --explain "SELECT ..."
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# The database the app (Utilities.shared_files_path) and the data generators use.
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "../../shared/database/financial_data.db")
+
+# Index name -> (table, column list). Trailing columns make the indexes covering
+# for the usual SUM(VALUE) / BALANCE aggregates.
+INDEXES = {
+    "idx_journaldata_book_date": ("journaldata", "SAP_BOOK_ID, ENTRY_DATE, TRANSACTION_TYPE, VALUE"),
+    "idx_journaldata_date_type": ("journaldata", "ENTRY_DATE, TRANSACTION_TYPE, VALUE"),
+    "idx_journaldata_type_currency": ("journaldata", "TRANSACTION_TYPE, TRANSACTION_CURRENCY, VALUE"),
+    "idx_journaldata_year": ("journaldata", "substr(ENTRY_DATE, 1, 4), SAP_BOOK_ID, VALUE"),
+    "idx_sapbalance_book_date": ("sapbalance", "SAP_BOOK_ID, DATE, BALANCE"),
+    "idx_sapbalance_date": ("sapbalance", "DATE, SAP_BOOK_ID, BALANCE"),
+}
+
+
+def _existing_tables(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")}
+
+
+def create_indexes(conn: sqlite3.Connection, analyze: bool = True) -> list:
+    """Create the managed indexes that are missing. Returns the names created."""
+    tables = _existing_tables(conn)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index';")}
+    created = []
+    for name, (table, columns) in INDEXES.items():
+        if table not in tables or name in existing:
+            continue
+        start = time.perf_counter()
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns});")
+        logger.info("Created index %s in %.1fs", name, time.perf_counter() - start)
+        created.append(name)
+    if analyze and created:
+        conn.execute("ANALYZE;")
+    conn.commit()
+    return created
+
+
+def drop_indexes(conn: sqlite3.Connection) -> None:
+    """Drop the managed indexes."""
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name};")
+    conn.commit()
+
+
+def full_scans(plan: list) -> list:
+    """Return the plan steps that scan a whole table without an index."""
+    return [detail for detail in plan if detail.startswith("SCAN ") and "INDEX" not in detail]
+
+
+def explain_query_plan(conn: sqlite3.Connection, query: str) -> list:
+    """Return the EXPLAIN QUERY PLAN details for a query."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+
+async def async_explain_query_plan(conn: Any, query: str) -> list:
+    """EXPLAIN QUERY PLAN on an aiosqlite connection."""
+    async with conn.execute(f"EXPLAIN QUERY PLAN {query}") as cursor:
+        return [row[3] async for row in cursor]
+
+
+def format_query_plan(query: str, plan: list) -> str:
+    """Render a query plan for the console."""
+    return f"Query plan for {query}:\n  " + "\n  ".join(plan)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage indexes on the financial SQLite database.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the SQLite database.")
+    parser.add_argument("--drop", action="store_true", help="Drop the managed indexes.")
+    parser.add_argument("--explain", metavar="SQL", help="Print the query plan for a query.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.explain:
+            plan = explain_query_plan(conn, args.explain)
+            print("\n".join(plan))
+            for scan in full_scans(plan):
+                print(f"⚠️ Full table scan: {scan}")
+        elif args.drop:
+            drop_indexes(conn)
+            print("✅ Managed indexes dropped.")
+        else:
+            created = create_indexes(conn)
+            print(f"✅ Created {len(created)} index(es): {', '.join(created) or 'none needed'}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
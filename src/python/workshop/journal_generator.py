@@ -0,0 +1,309 @@
+"""Vectorized, seedable synthetic ledger generator.
+
+Builds sapbooks and journaldata column by column with NumPy instead of one
+row at a time. Every random draw comes from a seeded ``SeedSequence``: one
+stream for the book attributes, one for the number of entries per book and
+day, and one stream per book for its journal rows. The same seed and
+parameters therefore always produce the same dataset.
+
+Books are independent once the entry counts are known: each book has its own
+random stream and document-number range. With ``--workers`` the books are
+sharded across processes, every shard writes its own file, and the shard
+files are concatenated in book order, so the output is identical to a
+single-process run.
+
+Usage:
+    python journal_generator.py --books 200 --date-range 2017-01-02:2025-06-04 --seed 42
+    python journal_generator.py --rows 100000000 --books 200 --output-dir /data/ledger
+    python journal_generator.py --books 200 --workers 8
+    python journal_generator.py --books 200 --format parquet
+"""
+
+import argparse
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ledger_parquet import write_parquet
+
+BOOK_COLUMNS = ["SAP_BOOK_ID", "SAP_BOOK_NAME", "COST_CENTER", "SYSTEM_ENTITY", "SYSTEM", "OPENING_BALANCE"]
+JOURNAL_COLUMNS = [
+    "SAP_BOOK_ID", "SAP_BOOK_NAME", "COST_CENTER", "TRANSACTION_CURRENCY", "VALUE",
+    "ENTRY_DATE", "POSTING_DATE", "USERNAME", "DOCUMENT_NUMBER", "TRANSACTION_TYPE",
+    "POSTED_BY", "APPROVED_BY", "CREATED_TIMESTAMP", "UPDATED_TIMESTAMP",
+    "SOURCE_SYSTEM", "REMARKS",
+]
+
+SYSTEM_ENTITIES = ["SAP", "Oracle", "NetSuite", "Dynamics", "QuickBooks"]
+SYSTEMS = ["SYSTEM1", "SYSTEM2", "SYSTEM3", "SYSTEM4", "SYSTEM5"]
+TRANSACTION_TYPES = ["Manual", "Auto-post", "Reversal", "Accrual"]
+SOURCE_SYSTEMS = ["SAP-FI", "SAP-CO", "Manual Entry"]
+REMARKS_SAMPLES = ["Year-end adjustment", "Reversal of DOC000123", "Cost center reallocation", "Audit correction"]
+
+DEFAULT_SEED = 42
+DEFAULT_START_DATE = date(2017, 1, 2)
+DEFAULT_END_DATE = date(2025, 6, 4)
+ENTRIES_PER_DAY_MEAN = 75
+ENTRIES_PER_DAY_STD = 25
+# Shards per worker: smaller shards balance uneven books across processes.
+SHARDS_PER_WORKER = 4
+
+# Lookup tables: string columns are built by indexing these with integer arrays.
+_USERS = np.array([f"user_{i}" for i in range(1, 51)], dtype=object)
+_MANAGERS = np.array([f"manager_{i}" for i in range(1, 6)] + [None], dtype=object)
+_CLOCK = np.array([f"{m // 60:02d}:{m % 60:02d}:00" for m in range(24 * 60)], dtype=object)
+
+
+class LedgerSpec:
+    """Parameters of a synthetic ledger, with its random streams."""
+
+    def __init__(
+        self,
+        num_books: int,
+        start_date: date = DEFAULT_START_DATE,
+        end_date: date = DEFAULT_END_DATE,
+        seed: int = DEFAULT_SEED,
+        entries_mean: float = ENTRIES_PER_DAY_MEAN,
+        entries_std: float = ENTRIES_PER_DAY_STD,
+        total_rows: Optional[int] = None,
+    ) -> None:
+        self.num_books = num_books
+        self.dates = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+        self.seed = seed
+        self.entries_mean = entries_mean
+        self.entries_std = entries_std
+        self.total_rows = total_rows
+        books_seq, counts_seq, *journal_seqs = np.random.SeedSequence(seed).spawn(num_books + 2)
+        self._books_seq = books_seq
+        self._counts_seq = counts_seq
+        self._journal_seqs = journal_seqs
+        # Date strings for every day an entry, posting or update can fall on.
+        all_days = np.arange(self.dates[0], self.dates[-1] + 4)
+        self._day_strings = np.array(np.datetime_as_string(all_days, unit="D"), dtype=object)
+        self._day_compact = np.char.replace(np.datetime_as_string(all_days, unit="D"), "-", "")
+
+    @property
+    def num_days(self) -> int:
+        return len(self.dates)
+
+    def books(self) -> pd.DataFrame:
+        """The sapbooks table."""
+        rng = np.random.default_rng(self._books_seq)
+        ids = np.arange(1, self.num_books + 1)
+        return pd.DataFrame({
+            "SAP_BOOK_ID": [f"SAPB{i:04d}" for i in ids],
+            "SAP_BOOK_NAME": [f"Book_{i}" for i in ids],
+            "COST_CENTER": [f"CC{i}" for i in rng.integers(100, 1000, self.num_books)],
+            "SYSTEM_ENTITY": np.array(SYSTEM_ENTITIES, dtype=object)[rng.integers(0, len(SYSTEM_ENTITIES), self.num_books)],
+            "SYSTEM": np.array(SYSTEMS, dtype=object)[rng.integers(0, len(SYSTEMS), self.num_books)],
+            "OPENING_BALANCE": rng.integers(5_000_000, 10_000_000, self.num_books),
+        })
+
+    def entry_counts(self) -> np.ndarray:
+        """Number of journal entries per book (rows) and day (columns)."""
+        rng = np.random.default_rng(self._counts_seq)
+        shape = (self.num_books, self.num_days)
+        if self.total_rows is None:
+            counts = rng.normal(self.entries_mean, self.entries_std, shape).astype(np.int64)
+            return np.maximum(counts, 1)
+        # Spread exactly total_rows over the cells with the same relative jitter.
+        weights = np.maximum(rng.normal(1.0, self.entries_std / self.entries_mean, shape), 0.05)
+        return rng.multinomial(self.total_rows, (weights / weights.sum()).ravel()).reshape(shape)
+
+    def document_offsets(self, counts: np.ndarray) -> np.ndarray:
+        """First document counter of each book, so books can be generated independently."""
+        per_book = counts.sum(axis=1)
+        return np.concatenate(([1], 1 + np.cumsum(per_book)[:-1]))
+
+    def book_journal(self, book: pd.Series, book_index: int, counts: np.ndarray, first_document: int) -> pd.DataFrame:
+        """Generate all journal rows of one book."""
+        rng = np.random.default_rng(self._journal_seqs[book_index])
+        n = int(counts.sum())
+        day = np.repeat(np.arange(self.num_days), counts)
+
+        volatility = rng.normal(1, 0.05, self.num_days)[day]
+        values = (rng.uniform(-50000, 50000, n) * volatility).astype(np.int64)
+        created_minute = rng.integers(0, 24 * 60, n)
+        updated_minute = created_minute + rng.integers(1, 91, n)
+        updated_day = day + updated_minute // (24 * 60)
+        approver = np.where(rng.random(n) < 0.3, len(_MANAGERS) - 1, rng.integers(0, len(_MANAGERS) - 1, n))
+        counter = np.arange(first_document, first_document + n).astype(str)
+
+        return pd.DataFrame({
+            "SAP_BOOK_ID": np.full(n, book["SAP_BOOK_ID"], dtype=object),
+            "SAP_BOOK_NAME": np.full(n, book["SAP_BOOK_NAME"], dtype=object),
+            "COST_CENTER": np.full(n, book["COST_CENTER"], dtype=object),
+            "TRANSACTION_CURRENCY": np.full(n, "USD", dtype=object),
+            "VALUE": values,
+            "ENTRY_DATE": self._day_strings[day],
+            "POSTING_DATE": self._day_strings[day + rng.integers(0, 3, n)],
+            "USERNAME": _USERS[rng.integers(0, 50, n)],
+            "DOCUMENT_NUMBER": np.char.add(np.char.add("DOC", self._day_compact[day]), np.char.zfill(counter, 3)).astype(object),
+            "TRANSACTION_TYPE": np.array(TRANSACTION_TYPES, dtype=object)[rng.integers(0, len(TRANSACTION_TYPES), n)],
+            "POSTED_BY": _USERS[rng.integers(0, 20, n)],
+            "APPROVED_BY": _MANAGERS[approver],
+            "CREATED_TIMESTAMP": self._day_strings[day] + " " + _CLOCK[created_minute],
+            "UPDATED_TIMESTAMP": self._day_strings[updated_day] + " " + _CLOCK[updated_minute % (24 * 60)],
+            "SOURCE_SYSTEM": np.array(SOURCE_SYSTEMS, dtype=object)[rng.integers(0, len(SOURCE_SYSTEMS), n)],
+            "REMARKS": np.array(REMARKS_SAMPLES, dtype=object)[rng.integers(0, len(REMARKS_SAMPLES), n)],
+        })
+
+    def journal_chunks(self, books: Optional[pd.DataFrame] = None, workers: int = 1) -> Iterator[pd.DataFrame]:
+        """Yield the journal one book at a time, ordered by book and entry date.
+
+        With more than one worker the books are generated in a process pool and
+        still yielded in book order; at most two shards per worker are in flight.
+        """
+        books = self.books() if books is None else books
+        counts = self.entry_counts()
+        offsets = self.document_offsets(counts)
+        if workers <= 1:
+            for index, (_, book) in enumerate(books.iterrows()):
+                yield self.book_journal(book, index, counts[index], int(offsets[index]))
+            return
+
+        shards = shard_books(len(books), workers * SHARDS_PER_WORKER)
+        tasks = iter([(self, books.iloc[shard], shard, counts[shard], offsets[shard]) for shard in shards])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque(executor.submit(_generate_shard, task) for task in islice(tasks, 2 * workers))
+            while pending:
+                chunks = pending.popleft().result()
+                for task in islice(tasks, 1):
+                    pending.append(executor.submit(_generate_shard, task))
+                yield from chunks
+
+
+def shard_books(num_books: int, num_shards: int) -> List[range]:
+    """Split book indexes into contiguous, non-empty ranges of near-equal size."""
+    num_shards = max(1, min(num_shards, num_books))
+    bounds = np.linspace(0, num_books, num_shards + 1).astype(int)
+    return [range(low, high) for low, high in zip(bounds[:-1], bounds[1:]) if high > low]
+
+
+def _shard_journals(spec: LedgerSpec, books: pd.DataFrame, shard: range, counts: np.ndarray, offsets: np.ndarray) -> Iterator[pd.DataFrame]:
+    for position, (_, book) in enumerate(books.iterrows()):
+        yield spec.book_journal(book, shard[position], counts[position], int(offsets[position]))
+
+
+def _generate_shard(task: tuple) -> List[pd.DataFrame]:
+    """Process pool entry point: generate the journal frames of one shard."""
+    return list(_shard_journals(*task))
+
+
+def _write_shard(task: tuple) -> int:
+    """Process pool entry point: write one shard to its own CSV file (no header)."""
+    path, *shard_task = task
+    rows = 0
+    with open(path, "w", newline="") as shard_file:
+        for chunk in _shard_journals(*shard_task):
+            chunk.to_csv(shard_file, header=False, index=False)
+            rows += len(chunk)
+    return rows
+
+def parse_date_range(value: str) -> tuple:
+    """Parse ``YYYY-MM-DD:YYYY-MM-DD``."""
+    try:
+        start, end = value.split(":")
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Expected START:END as YYYY-MM-DD:YYYY-MM-DD, got {value!r}") from e
+    if end_date < start_date:
+        raise argparse.ArgumentTypeError("The end date is before the start date.")
+    return start_date, end_date
+
+
+def write_csv(spec: LedgerSpec, output_dir: str, workers: int = 1) -> int:
+    """Write sapbooks.csv and journaldata.csv. Returns the number of journal rows."""
+    os.makedirs(output_dir, exist_ok=True)
+    books = spec.books()
+    books.to_csv(os.path.join(output_dir, "sapbooks.csv"), index=False)
+    if workers > 1:
+        return _write_journal_parallel(spec, books, output_dir, workers)
+
+    rows = 0
+    with open(os.path.join(output_dir, "journaldata.csv"), "w", newline="") as journal_file:
+        journal_file.write(",".join(JOURNAL_COLUMNS) + "\n")
+        for chunk in spec.journal_chunks(books):
+            chunk.to_csv(journal_file, header=False, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def _write_journal_parallel(spec: LedgerSpec, books: pd.DataFrame, output_dir: str, workers: int) -> int:
+    """Write journal shards in a process pool, then concatenate them in book order."""
+    counts = spec.entry_counts()
+    offsets = spec.document_offsets(counts)
+    shard_dir = os.path.join(output_dir, "journaldata.shards")
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = shard_books(len(books), workers * SHARDS_PER_WORKER)
+    paths = [os.path.join(shard_dir, f"part-{number:05d}.csv") for number in range(len(shards))]
+    tasks = [(path, spec, books.iloc[shard], shard, counts[shard], offsets[shard]) for path, shard in zip(paths, shards)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = sum(executor.map(_write_shard, tasks))
+
+        with open(os.path.join(output_dir, "journaldata.csv"), "wb") as journal_file:
+            journal_file.write((",".join(JOURNAL_COLUMNS) + "\n").encode())
+            for path in paths:
+                with open(path, "rb") as shard_file:
+                    shutil.copyfileobj(shard_file, journal_file, 16 * 1024 * 1024)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    return rows
+
+def write_ledger_parquet(spec: LedgerSpec, output_dir: str, workers: int = 1) -> int:
+    """Write sapbooks.parquet and journaldata.parquet. Returns the number of journal rows."""
+    os.makedirs(output_dir, exist_ok=True)
+    books = spec.books()
+    write_parquet([books], os.path.join(output_dir, "sapbooks.parquet"), "sapbooks")
+    return write_parquet(spec.journal_chunks(books, workers), os.path.join(output_dir, "journaldata.parquet"), "journaldata")
+
+
+def write_ledger(spec: LedgerSpec, output_dir: str, workers: int = 1, file_format: str = "csv") -> int:
+    """Write the ledger as CSV or Parquet files. Returns the number of journal rows."""
+    if file_format == "parquet":
+        return write_ledger_parquet(spec, output_dir, workers)
+    return write_csv(spec, output_dir, workers)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate a synthetic SAP ledger (sapbooks and journaldata).")
+    parser.add_argument("--books", type=int, default=200, help="Number of SAP books.")
+    parser.add_argument(
+        "--date-range",
+        type=parse_date_range,
+        default=(DEFAULT_START_DATE, DEFAULT_END_DATE),
+        help="Entry dates as START:END (YYYY-MM-DD:YYYY-MM-DD).",
+    )
+    parser.add_argument("--rows", type=int, default=None, help="Exact number of journal rows (default: ~75 per book and day).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed.")
+    parser.add_argument("--output-dir", default=".", help="Directory for the generated files.")
+    parser.add_argument("--workers", type=int, default=1, help="Generator processes (books are sharded across them).")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output file format.")
+    return parser
+
+
+def spec_from_args(args: argparse.Namespace) -> LedgerSpec:
+    start_date, end_date = args.date_range
+    return LedgerSpec(args.books, start_date, end_date, seed=args.seed, total_rows=args.rows)
+
+
+def main() -> None:
+    args = build_arg_parser().parse_args()
+    spec = spec_from_args(args)
+    start = time.perf_counter()
+    rows = write_ledger(spec, args.output_dir, workers=args.workers, file_format=args.format)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Generated {rows:,} journal rows for {spec.num_books} books in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
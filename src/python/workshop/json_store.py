@@ -0,0 +1,40 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class JsonStore:
+    """A JSON object kept in one file, shared by the local caches.
+
+    A missing or unreadable file reads as an empty object. Writes go to a
+    temporary file that then replaces the store, so readers (and the next
+    process) never see a partially written file.
+    """
+
+    def __init__(self, path: Path, description: str = "JSON store") -> None:
+        self.path = Path(path)
+        self.description = description
+
+    def read(self) -> dict:
+        try:
+            with self.path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable %s %s: %s", self.description, self.path, e)
+            return {}
+
+    def write(self, data: dict) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write %s %s: %s", self.description, self.path, e)
@@ -0,0 +1,148 @@
+"""Parquet storage for the generated ledger tables.
+
+Each table is one Parquet file with explicit column types. Rows arrive
+ordered by book and date and every (book, year) slice becomes its own row
+group, so readers that filter on SAP_BOOK_ID and a date range only
+decompress the matching row groups (pruned by min/max statistics), and
+readers that need a few columns only read those column chunks.
+
+Usage:
+    python ledger_parquet.py journaldata.csv journaldata.parquet    # convert a generated CSV
+"""
+
+import argparse
+import os
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PARQUET_COMPRESSION = "zstd"
+# Rows per batch when streaming a Parquet file back.
+PARQUET_BATCH_ROWS = 100_000
+
+_TEXT = pa.string()
+_INT = pa.int64()
+
+SCHEMAS = {
+    "sapbooks": pa.schema([
+        ("SAP_BOOK_ID", _TEXT), ("SAP_BOOK_NAME", _TEXT), ("COST_CENTER", _TEXT),
+        ("SYSTEM_ENTITY", _TEXT), ("SYSTEM", _TEXT), ("OPENING_BALANCE", _INT),
+    ]),
+    "journaldata": pa.schema([
+        ("SAP_BOOK_ID", _TEXT), ("SAP_BOOK_NAME", _TEXT), ("COST_CENTER", _TEXT),
+        ("TRANSACTION_CURRENCY", _TEXT), ("VALUE", _INT), ("ENTRY_DATE", _TEXT),
+        ("POSTING_DATE", _TEXT), ("USERNAME", _TEXT), ("DOCUMENT_NUMBER", _TEXT),
+        ("TRANSACTION_TYPE", _TEXT), ("POSTED_BY", _TEXT), ("APPROVED_BY", _TEXT),
+        ("CREATED_TIMESTAMP", _TEXT), ("UPDATED_TIMESTAMP", _TEXT),
+        ("SOURCE_SYSTEM", _TEXT), ("REMARKS", _TEXT),
+    ]),
+    "sapbalance": pa.schema([
+        ("SAP_BOOK_ID", _TEXT), ("DATE", _TEXT), ("BALANCE", _INT),
+        ("DAILY_CHANGE", _INT), ("TOTAL_JOURNALS", _INT), ("LAST_UPDATED_BY", _TEXT),
+    ]),
+}
+# Column holding the ISO date that row groups are split on, per table.
+DATE_COLUMNS = {"journaldata": "ENTRY_DATE", "sapbalance": "DATE"}
+
+
+def _partition_bounds(frame: pd.DataFrame, date_column: str) -> List[int]:
+    """Row offsets where the (book, year) key changes in an ordered frame."""
+    keys = frame["SAP_BOOK_ID"].to_numpy(dtype=object) + "|" + frame[date_column].str.slice(0, 4).to_numpy(dtype=object)
+    changes = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return [0, *changes.tolist(), len(frame)]
+
+
+class LedgerParquetWriter:
+    """Write one ledger table to a Parquet file, one row group per (book, year)."""
+
+    def __init__(self, path: str, table: str, compression: str = PARQUET_COMPRESSION) -> None:
+        self.schema = SCHEMAS[table]
+        self.date_column = DATE_COLUMNS.get(table)
+        self.rows = 0
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write_frame(self, frame: pd.DataFrame) -> None:
+        """Append a frame ordered by book and date."""
+        if frame.empty:
+            return
+        table = pa.Table.from_pandas(frame[self.schema.names], schema=self.schema, preserve_index=False)
+        if self.date_column is None:
+            self._writer.write_table(table)
+        else:
+            bounds = _partition_bounds(frame, self.date_column)
+            for low, high in zip(bounds[:-1], bounds[1:]):
+                self._writer.write_table(table.slice(low, high - low), row_group_size=high - low)
+        self.rows += len(frame)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> "LedgerParquetWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_parquet(frames: Iterable[pd.DataFrame], path: str, table: str) -> int:
+    """Write ordered frames of a ledger table to a Parquet file. Returns the number of rows."""
+    with LedgerParquetWriter(path, table) as writer:
+        for frame in frames:
+            writer.write_frame(frame)
+    return writer.rows
+
+
+def _filters(books: Optional[Iterable[str]], years: Optional[Iterable[int]], date_column: Optional[str]) -> Optional[list]:
+    """Build pyarrow filters in disjunctive normal form: one conjunction per requested year."""
+    base = [("SAP_BOOK_ID", "in", list(books))] if books is not None else []
+    if years is None or date_column is None:
+        return [base] if base else None
+    return [
+        base + [(date_column, ">=", f"{year:04d}-01-01"), (date_column, "<", f"{year + 1:04d}-01-01")]
+        for year in sorted({int(year) for year in years})
+    ]
+
+
+def read_parquet(
+    path: str,
+    table: str,
+    columns: Optional[List[str]] = None,
+    books: Optional[Iterable[str]] = None,
+    years: Optional[Iterable[int]] = None,
+) -> pd.DataFrame:
+    """Read a ledger table, restricted to the given columns, books and years."""
+    return pd.read_parquet(path, columns=columns, filters=_filters(books, years, DATE_COLUMNS.get(table)))
+
+
+def iter_parquet(path: str, columns: Optional[List[str]] = None, batch_rows: int = PARQUET_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream a Parquet file as DataFrames in file order."""
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def csv_to_parquet(csv_path: str, parquet_path: str, table: str, chunksize: int = PARQUET_BATCH_ROWS) -> int:
+    """Convert a generated ledger CSV to Parquet. Returns the number of rows."""
+    dtypes = {field.name: "string" if field.type == _TEXT else "int64" for field in SCHEMAS[table]}
+    return write_parquet(pd.read_csv(csv_path, chunksize=chunksize, dtype=dtypes), parquet_path, table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a generated ledger CSV file to Parquet.")
+    parser.add_argument("csv_path", help="sapbooks.csv, journaldata.csv or sapbalance.csv")
+    parser.add_argument("parquet_path", help="Output Parquet file.")
+    parser.add_argument("--table", choices=sorted(SCHEMAS), help="Ledger table (default: the CSV file name).")
+    args = parser.parse_args()
+
+    table = args.table or os.path.splitext(os.path.basename(args.csv_path))[0]
+    if table not in SCHEMAS:
+        parser.error(f"Cannot infer the table from {args.csv_path!r}; pass --table.")
+    rows = csv_to_parquet(args.csv_path, args.parquet_path, table)
+    print(f"✅ Wrote {rows:,} rows to {args.parquet_path}")
+
+
+if __name__ == "__main__":
+    main()
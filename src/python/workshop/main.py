@@ -15,7 +15,9 @@ from azure.ai.projects.models import (
 from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
-from FinancialData import FinancialData
+from agent_registry import AGENT_REGISTRY_FILE, AgentRegistry
+from data_backend import configured_backend, create_backend
+from fake_project_client import FakeProjectClient, fake_cache_root
 from stream_event_handler import StreamEventHandler
 from terminal_colors import TerminalColors as tc
 from utilities import Utilities
@@ -41,23 +43,28 @@ INSTRUCTIONS_FILE = None
 
 
 toolset = AsyncToolSet()
-utilities = Utilities()
-FinancialData = FinancialData(utilities)
 
+if os.getenv("FAKE_AGENT_SERVICE"):
+    # Offline stand-in for load testing and profiling, see fake_project_client.py
+    project_client = FakeProjectClient.from_env()
+    # Fake IDs are kept out of the real service's caches.
+    utilities = Utilities(cache_root=fake_cache_root())
+else:
+    project_client = AIProjectClient.from_connection_string(
+        credential=DefaultAzureCredential(exclude_managed_identity_credential=True),
+        conn_str=PROJECT_CONNECTION_STRING,
+    )
+    utilities = Utilities()
 
-project_client = AIProjectClient.from_connection_string(
-    credential=DefaultAzureCredential(exclude_managed_identity_credential=True),
-    conn_str=PROJECT_CONNECTION_STRING,
-)
+# Reuses the agent across restarts while its model, instructions and tools are unchanged.
+agent_registry = AgentRegistry(utilities.cache_root / AGENT_REGISTRY_FILE)
+# The data backend (SQLite or SQL Server) is selected with the DATA_BACKEND environment variable.
+FinancialData = create_backend(configured_backend(), utilities)
 
-functions = AsyncFunctionTool(
-    {
-        FinancialData.async_fetch_data_using_sqlite_query,
-    }
-)
+functions = AsyncFunctionTool(FinancialData.tool_functions())
 
 
-INSTRUCTIONS_FILE = "instructions/code_interpreter.txt"
+INSTRUCTIONS_FILE = FinancialData.instructions_file
 
 
 
@@ -116,16 +123,18 @@ async def initialize() -> tuple[Agent, AgentThread]:
             instructions = instructions.replace(
                 "{font_file_id}", font_file_info.id)
 
-        print("Creating agent...")
-        agent = await project_client.agents.create_agent(
+        print("Getting agent...")
+        agent = await agent_registry.get_or_create_agent(
+            project_client,
             model=API_DEPLOYMENT_NAME,
             name=AGENT_NAME,
             instructions=instructions,
             toolset=toolset,
+            backend=FinancialData.name,
             temperature=TEMPERATURE,
             # headers={"x-ms-enable-preview": "true"},
         )
-        print(f"Created agent, ID: {agent.id}")
+        print(f"Using agent, ID: {agent.id}")
 
         project_client.agents.enable_auto_function_calls(toolset=toolset)
         print("Enabled auto function calls.")
@@ -142,12 +151,11 @@ async def initialize() -> tuple[Agent, AgentThread]:
 
 
 async def cleanup(agent: Agent, thread: AgentThread) -> None:
-    """Cleanup the resources."""
+    """Cleanup the resources. The agent is kept so the next run can reuse it."""
     existing_files = await project_client.agents.list_files()
     for f in existing_files.data:
         await project_client.agents.delete_file(f.id)
     await project_client.agents.delete_thread(thread.id)
-    await project_client.agents.delete_agent(agent.id)
     await FinancialData.close()
 
 
@@ -211,7 +219,7 @@ async def main() -> None:
             )
         else:
             await cleanup(agent, thread)
-            print("The agent resources have been cleaned up.")
+            print("The thread and files have been cleaned up. The agent is kept for the next run.")
 
 
 if __name__ == "__main__":
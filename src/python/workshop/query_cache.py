@@ -0,0 +1,132 @@
+import re
+import sys
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+CACHE_TTL_SECONDS = 300.0
+
+# Quoted literals and identifiers are kept verbatim, everything else is normalized.
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_WHITESPACE = re.compile(r"\s+")
+# Results that depend on the clock or a random source must not be reused.
+_VOLATILE = re.compile(r"\b(random|randomblob|current_date|current_time|current_timestamp)\b|'now'", re.IGNORECASE)
+
+
+def normalize_sql(query: str) -> str:
+    """Normalize whitespace, case and trailing semicolons outside of quoted literals."""
+    parts = _QUOTED.split(query.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = _WHITESPACE.sub(" ", parts[i].lower())
+    return "".join(parts).strip()
+
+
+def is_cacheable(query: str) -> bool:
+    """Only deterministic read queries are cached."""
+    normalized = normalize_sql(query)
+    return normalized.startswith(("select", "with")) and not _VOLATILE.search(query)
+
+
+class CacheEntry:
+    """A cached query result."""
+
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: str, size: int, expires_at: float) -> None:
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class QueryResultCache:
+    """In-process LRU + TTL cache for serialized query results.
+
+    Entries are tagged with a data version (for example the database file's
+    mtime and size). When the version changes the whole cache is dropped,
+    because any table may have changed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl: float = CACHE_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[Hashable] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Hashable) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self.clear()
+            self._version = version
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, query: str, version: Hashable) -> Optional[str]:
+        """Return the cached result for the query, or None."""
+        if not is_cacheable(query):
+            return None
+        self._check_version(version)
+        key = normalize_sql(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, query: str, value: str, version: Hashable) -> None:
+        """Store a result, evicting least recently used entries to stay within the caps."""
+        if not is_cacheable(query):
+            return
+        self._check_version(version)
+        key = normalize_sql(query)
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(value, size, time.monotonic() + self.ttl)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
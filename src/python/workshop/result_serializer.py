@@ -0,0 +1,190 @@
+import json
+import math
+import time as _time
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+
+FETCH_BATCH_SIZE = 500
+RESULT_MAX_BYTES = 1024 * 1024
+RESULT_MAX_ROWS = 500
+
+NO_RESULTS = json.dumps("The query returned no results.")
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON types returned by sqlite3 and pyodbc."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _clean_float(value: Any) -> Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _encode(value: Any) -> str:
+    try:
+        return json.dumps(value, separators=(",", ":"), default=_json_default, allow_nan=False)
+    except ValueError:
+        # NaN or infinity somewhere in the batch: encode it as null, like pandas does.
+        rows = [[_clean_float(v) for v in row] for row in value]
+        return json.dumps(rows, separators=(",", ":"), default=_json_default)
+
+
+class SplitJsonWriter:
+    """Build the pandas ``orient="split"`` JSON layout directly from row batches.
+
+    Output is ``{"columns":[...],"data":[[...],...]}``. Rows are encoded as
+    they arrive and the writer stops accepting rows once ``max_rows`` or
+    ``max_bytes`` is reached. A truncated result carries a ``"truncated"``
+    object with the reason and the limits that applied.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        max_bytes: Optional[int] = RESULT_MAX_BYTES,
+        max_rows: Optional[int] = RESULT_MAX_ROWS,
+    ) -> None:
+        self._head = '{"columns":' + _encode(list(columns)) + ',"data":['
+        self._parts: list[str] = []
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.bytes_written = len(self._head) + 2
+        self.rows_written = 0
+        self.truncated_reason: Optional[str] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.truncated_reason is not None
+
+    def truncate(self, reason: str) -> None:
+        """Stop accepting rows, recording why."""
+        if self.truncated_reason is None:
+            self.truncated_reason = reason
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> bool:
+        """Add a batch of rows. Returns False once a limit has been reached."""
+        if self.truncated:
+            return False
+        if not rows:
+            return True
+        if not isinstance(rows[0], (tuple, list)):
+            # pyodbc.Row is not JSON serializable as is.
+            rows = [tuple(row) for row in rows]
+
+        over_rows = self.max_rows is not None and self.rows_written + len(rows) > self.max_rows
+        if over_rows:
+            rows = rows[: self.max_rows - self.rows_written]
+
+        encoded = _encode(rows)[1:-1] if rows else ""
+        size = len(encoded) + (1 if self._parts else 0)
+        if self.max_bytes is None or self.bytes_written + size <= self.max_bytes:
+            if rows:
+                self._parts.append(encoded)
+                self.bytes_written += size
+                self.rows_written += len(rows)
+            if over_rows:
+                self.truncate("max_rows")
+                return False
+            return True
+
+        # The batch does not fit: keep as many whole rows as the budget allows.
+        for row in rows:
+            encoded = _encode([row])[1:-1]
+            size = len(encoded) + (1 if self._parts else 0)
+            if self.bytes_written + size > self.max_bytes:
+                break
+            self._parts.append(encoded)
+            self.bytes_written += size
+            self.rows_written += 1
+        self.truncate("max_bytes")
+        return False
+
+    def getvalue(self) -> str:
+        """Return the JSON document."""
+        tail = "]"
+        if self.truncated:
+            truncated = {
+                "reason": self.truncated_reason,
+                "rows_returned": self.rows_written,
+                "max_rows": self.max_rows,
+                "max_bytes": self.max_bytes,
+                "message": "The result was truncated. Refine the query with aggregation or a smaller LIMIT.",
+            }
+            tail += ',"truncated":' + json.dumps(truncated, separators=(",", ":"))
+        return self._head + ",".join(self._parts) + tail + "}"
+
+    def result(self) -> str:
+        """Return the JSON document, or the no-results message if nothing was written."""
+        return self.getvalue() if self.rows_written or self.truncated else NO_RESULTS
+
+
+def _columns(cursor: Any) -> list[str]:
+    return [description[0] for description in cursor.description]
+
+
+def _deadline_passed(deadline: Optional[float]) -> bool:
+    return deadline is not None and _time.monotonic() > deadline
+
+
+async def write_async_cursor(
+    writer: SplitJsonWriter, cursor: Any, batch_size: int = FETCH_BATCH_SIZE, deadline: Optional[float] = None
+) -> None:
+    """Feed an aiosqlite cursor into the writer until it is exhausted or a limit is hit."""
+    while True:
+        rows = await cursor.fetchmany(batch_size)
+        if not rows or not writer.write_rows(rows):
+            break
+        if _deadline_passed(deadline):
+            writer.truncate("timeout")
+            break
+
+
+def write_cursor(
+    writer: SplitJsonWriter, cursor: Any, batch_size: int = FETCH_BATCH_SIZE, deadline: Optional[float] = None
+) -> None:
+    """Feed a DB-API cursor (sqlite3, pyodbc) into the writer until it is exhausted or a limit is hit."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows or not writer.write_rows(rows):
+            break
+        if _deadline_passed(deadline):
+            writer.truncate("timeout")
+            break
+
+
+async def serialize_async_cursor(
+    cursor: Any,
+    batch_size: int = FETCH_BATCH_SIZE,
+    max_bytes: Optional[int] = RESULT_MAX_BYTES,
+    max_rows: Optional[int] = RESULT_MAX_ROWS,
+) -> str:
+    """Serialize an aiosqlite cursor batch by batch."""
+    if cursor.description is None:
+        return NO_RESULTS
+    writer = SplitJsonWriter(_columns(cursor), max_bytes=max_bytes, max_rows=max_rows)
+    await write_async_cursor(writer, cursor, batch_size)
+    return writer.result()
+
+
+def serialize_cursor(
+    cursor: Any,
+    batch_size: int = FETCH_BATCH_SIZE,
+    max_bytes: Optional[int] = RESULT_MAX_BYTES,
+    max_rows: Optional[int] = RESULT_MAX_ROWS,
+    deadline: Optional[float] = None,
+) -> str:
+    """Serialize a DB-API cursor (sqlite3, pyodbc) batch by batch."""
+    if cursor.description is None:
+        return NO_RESULTS
+    writer = SplitJsonWriter(_columns(cursor), max_bytes=max_bytes, max_rows=max_rows)
+    write_cursor(writer, cursor, batch_size, deadline)
+    return writer.result()
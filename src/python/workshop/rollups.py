@@ -0,0 +1,145 @@
+"""Pre-aggregated journal tables for the financial SQLite database.
+
+Maintains book x month x transaction type and book x year x transaction type
+rollups of journaldata (sum, count, min, max of VALUE). Refreshes are
+incremental: only journal rows with a rowid above the last processed one are
+aggregated and merged into the existing totals. A rollup whose last
+processed rowid is above the current max(rowid) (journaldata was emptied
+and reloaded with fewer rows) is rebuilt. journaldata is otherwise treated
+as an append-only ledger; after in-place updates or deletes run a full
+rebuild.
+
+Usage:
+    python rollups.py            # incremental refresh
+    python rollups.py --full     # rebuild from scratch
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# The database the app (Utilities.shared_files_path) and the data generators use.
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "../../shared/database/financial_data.db")
+ROLLUP_STATE_TABLE = "rollup_state"
+# Journal rows aggregated per transaction.
+REFRESH_BATCH_ROWS = 1_000_000
+
+# Rollup table -> (period column, expression over ENTRY_DATE, description for the agent)
+ROLLUPS = {
+    "journal_rollup_monthly": (
+        "MONTH",
+        "substr(ENTRY_DATE, 1, 7)",
+        "journaldata pre-aggregated per SAP_BOOK_ID, MONTH ('YYYY-MM') and TRANSACTION_TYPE",
+    ),
+    "journal_rollup_yearly": (
+        "YEAR",
+        "substr(ENTRY_DATE, 1, 4)",
+        "journaldata pre-aggregated per SAP_BOOK_ID, YEAR ('YYYY') and TRANSACTION_TYPE",
+    ),
+}
+
+
+def create_rollup_tables(conn: sqlite3.Connection) -> None:
+    """Create the rollup tables and the refresh state table if they are missing."""
+    for table, (period, _, _) in ROLLUPS.items():
+        conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+    SAP_BOOK_ID TEXT NOT NULL,
+    {period} TEXT NOT NULL,
+    TRANSACTION_TYPE TEXT NOT NULL,
+    TOTAL_VALUE INTEGER,
+    JOURNAL_COUNT INTEGER,
+    MIN_VALUE INTEGER,
+    MAX_VALUE INTEGER,
+    PRIMARY KEY (SAP_BOOK_ID, {period}, TRANSACTION_TYPE)
+)"""
+        )
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} (ROLLUP_NAME TEXT PRIMARY KEY, LAST_ROWID INTEGER NOT NULL)"
+    )
+
+
+def _watermark(conn: sqlite3.Connection, table: str) -> int:
+    row = conn.execute(f"SELECT LAST_ROWID FROM {ROLLUP_STATE_TABLE} WHERE ROLLUP_NAME = ?", (table,)).fetchone()
+    return row[0] if row else 0
+
+
+def _reset(conn: sqlite3.Connection, table: str) -> None:
+    conn.execute(f"DELETE FROM {table}")
+    conn.execute(f"DELETE FROM {ROLLUP_STATE_TABLE} WHERE ROLLUP_NAME = ?", (table,))
+
+
+def _merge_range(conn: sqlite3.Connection, table: str, low: int, high: int) -> None:
+    period, expression, _ = ROLLUPS[table]
+    conn.execute(
+        f"""INSERT INTO {table} (SAP_BOOK_ID, {period}, TRANSACTION_TYPE, TOTAL_VALUE, JOURNAL_COUNT, MIN_VALUE, MAX_VALUE)
+SELECT SAP_BOOK_ID, {expression}, COALESCE(TRANSACTION_TYPE, ''), SUM(VALUE), COUNT(*), MIN(VALUE), MAX(VALUE)
+FROM journaldata
+WHERE rowid > ? AND rowid <= ?
+GROUP BY 1, 2, 3
+ON CONFLICT (SAP_BOOK_ID, {period}, TRANSACTION_TYPE) DO UPDATE SET
+    TOTAL_VALUE = TOTAL_VALUE + excluded.TOTAL_VALUE,
+    JOURNAL_COUNT = JOURNAL_COUNT + excluded.JOURNAL_COUNT,
+    MIN_VALUE = min(MIN_VALUE, excluded.MIN_VALUE),
+    MAX_VALUE = max(MAX_VALUE, excluded.MAX_VALUE)""",
+        (low, high),
+    )
+    conn.execute(
+        f"INSERT OR REPLACE INTO {ROLLUP_STATE_TABLE} (ROLLUP_NAME, LAST_ROWID) VALUES (?, ?)",
+        (table, high),
+    )
+
+
+def refresh_rollups(conn: sqlite3.Connection, full: bool = False, batch_rows: int = REFRESH_BATCH_ROWS) -> dict:
+    """Bring the rollup tables up to date with journaldata.
+
+    Returns the number of journal rows merged into each rollup.
+    """
+    create_rollup_tables(conn)
+    conn.commit()
+
+    max_rowid = conn.execute("SELECT COALESCE(max(rowid), 0) FROM journaldata").fetchone()[0]
+    merged = {}
+    for table in ROLLUPS:
+        start = time.perf_counter()
+        low = _watermark(conn, table)
+        if full or low > max_rowid:
+            if not full:
+                # journaldata was reloaded with fewer rows, so the totals no longer describe it.
+                logger.info("%s is ahead of journaldata (rowid %d > %d); rebuilding it", table, low, max_rowid)
+            with conn:
+                _reset(conn, table)
+            low = 0
+        merged[table] = max_rowid - low
+        while low < max_rowid:
+            high = min(low + batch_rows, max_rowid)
+            # Each batch and its watermark are committed together.
+            with conn:
+                _merge_range(conn, table, low, high)
+            low = high
+        logger.info("Refreshed %s (%d journal rows) in %.1fs", table, merged[table], time.perf_counter() - start)
+    return merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh the pre-aggregated journal tables.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the SQLite database.")
+    parser.add_argument("--full", action="store_true", help="Rebuild the rollups from scratch.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    conn = sqlite3.connect(args.db)
+    try:
+        merged = refresh_rollups(conn, full=args.full)
+        for table, rows in merged.items():
+            print(f"✅ {table}: merged {rows} journal rows")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
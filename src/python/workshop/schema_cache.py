@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+from json_store import JsonStore
+
+SCHEMA_CACHE_FILE = "cache/schema_digest.json"
+
+
+def file_identity(path: str) -> Optional[dict]:
+    """Identify a database file by device, inode, size and modification time."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"dev": stat.st_dev, "ino": stat.st_ino, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def database_identity(db_path: str) -> Optional[dict]:
+    """Identify a SQLite database by its main file plus its WAL file.
+
+    In WAL mode new rows land in ``<db>-wal`` while the main file's size and
+    mtime stay put until a checkpoint, so the WAL file must be part of the key.
+    """
+    identity = file_identity(db_path)
+    if identity is not None:
+        identity["wal"] = file_identity(f"{db_path}-wal")
+    return identity
+
+
+class SchemaDigestCache:
+    """Persist schema digests across process restarts, one entry per database file."""
+
+    def __init__(self, cache_path: Path) -> None:
+        self.cache_path = Path(cache_path)
+        self._store = JsonStore(self.cache_path, "schema cache")
+
+    def load(self, db_path: str) -> Optional[dict]:
+        """Return the cached digest for the database, or None."""
+        return self._store.read().get(str(Path(db_path).resolve()))
+
+    def save(self, db_path: str, digest: dict) -> None:
+        """Store the digest for the database, replacing the cache file atomically."""
+        data = self._store.read()
+        data[str(Path(db_path).resolve())] = digest
+        self._store.write(data)
@@ -14,25 +14,35 @@ from azure.ai.projects.models import (
     ThreadRun,
 )
 
+from token_renderer import TOKEN_FLUSH_CHARS, TOKEN_FLUSH_INTERVAL, BufferedTokenRenderer
 from utilities import Utilities
 
 
 class StreamEventHandler(AsyncAgentEventHandler[str]):
     """Handle LLM streaming events and tokens."""
 
-    def __init__(self, functions: AsyncFunctionTool, project_client: AIProjectClient, utilities: Utilities) -> None:
+    def __init__(
+        self,
+        functions: AsyncFunctionTool,
+        project_client: AIProjectClient,
+        utilities: Utilities,
+        flush_interval: float = TOKEN_FLUSH_INTERVAL,
+        max_chars: int = TOKEN_FLUSH_CHARS,
+    ) -> None:
         self.functions = functions
         self.project_client = project_client
         self.util = utilities
+        # Tokens are printed in batches instead of one flushed print per token.
+        self.renderer = BufferedTokenRenderer(self.util.log_token_blue, flush_interval, max_chars)
         super().__init__()
 
     async def on_message_delta(self, delta: MessageDeltaChunk) -> None:
         """Handle message delta events. This will be the streamed token"""
-        self.util.log_token_blue(delta.text)
+        await self.renderer.write(delta.text)
 
     async def on_thread_message(self, message: ThreadMessage) -> None:
         """Handle thread message events."""
-        pass
+        await self.renderer.flush()
         # if message.status == MessageStatus.COMPLETED:
         #     print()
         # self.util.log_msg_purple(f"ThreadMessage created. ID: {message.id}, " f"Status: {message.status}")
@@ -57,13 +67,18 @@ class StreamEventHandler(AsyncAgentEventHandler[str]):
         pass
 
     async def on_error(self, data: str) -> None:
+        await self.renderer.flush()
         print(f"An error occurred. Data: {data}")
 
     async def on_done(self) -> None:
         """Handle stream completion."""
-        pass
+        await self.renderer.close()
         # self.util.log_msg_purple(f"\nStream completed.")
 
+    def render_stats(self) -> dict:
+        """Token and frame counters of the terminal output."""
+        return self.renderer.stats()
+
     async def on_unhandled_event(self, event_type: str, event_data: Any) -> None:
         """Handle unhandled events."""
         # print(f"Unhandled Event Type: {event_type}, Data: {event_data}")
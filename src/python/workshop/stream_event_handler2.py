@@ -1,4 +1,5 @@
-from typing import Any
+import time
+from typing import Any, Optional
 import chainlit as cl
 
 from azure.ai.projects.aio import AIProjectClient
@@ -15,42 +16,96 @@ from azure.ai.projects.models import (
     ThreadRun,
 )
 
+from token_renderer import TOKEN_FLUSH_CHARS, TOKEN_FLUSH_INTERVAL, BufferedTokenRenderer
 from utilities import Utilities
 
 
 class StreamEventHandler2(AsyncAgentEventHandler[str]):
     """Handle LLM streaming events and tokens."""
 
-    def __init__(self, functions: AsyncFunctionTool, project_client: AIProjectClient, utilities: Utilities) -> None:
+    def __init__(
+        self,
+        functions: AsyncFunctionTool,
+        project_client: AIProjectClient,
+        utilities: Utilities,
+        flush_interval: float = TOKEN_FLUSH_INTERVAL,
+        max_chars: int = TOKEN_FLUSH_CHARS,
+    ) -> None:
         self.functions = functions
         self.project_client = project_client
         self.util = utilities
         self.msg = None
+        # Per-turn metrics; the turn starts when the handler is created for the run.
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.bytes_sent = 0
+        # Tokens are batched into one terminal write / websocket frame per time window.
+        self.terminal = BufferedTokenRenderer(self.util.log_token_blue, flush_interval, max_chars)
+        self.renderer = BufferedTokenRenderer(self._stream_to_message, flush_interval, max_chars)
         super().__init__()
 
-
-
-
-
-    async def on_message_delta(self, delta: MessageDeltaChunk) -> None:
-        token = delta.text
-        self.util.log_token_blue(token)
-
-        # If this is the first token, create a streaming message
+    async def _stream_to_message(self, text: str) -> None:
+        # If this is the first frame, create a streaming message
         if self.msg is None:
             self.msg = cl.Message(content="")
             await self.msg.send()
 
-        # Stream token into the current message
-        await self.msg.stream_token(token)
+        # Stream the batched tokens into the current message
+        await self.msg.stream_token(text)
+        self.bytes_sent += len(text.encode("utf-8"))
 
-    async def on_done(self) -> None:
-        # Mark the message as complete when done
+    async def _finish_message(self) -> None:
+        """Flush the buffered tokens and mark the current message as complete."""
+        await self.terminal.close()
+        await self.renderer.close()
         if self.msg:
             await self.msg.update()
+            self.bytes_sent += len(self.msg.content.encode("utf-8"))
             self.msg = None
 
+    async def on_message_delta(self, delta: MessageDeltaChunk) -> None:
+        token = delta.text
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        await self.terminal.write(token)
+        await self.renderer.write(token)
+
+    async def on_thread_message(self, message: ThreadMessage) -> None:
+        """Complete the streamed text of a finished message and show its images.
+
+        The text was already streamed token by token, so only the images
+        (charts from the code interpreter) are sent here, downloaded
+        concurrently and shown together in one message.
+        """
+        if message.status != MessageStatus.COMPLETED:
+            return
+        await self._finish_message()
+        if not message.image_contents:
+            return
+        paths = await self.util.get_files(message, self.project_client)
+        if paths:
+            images = [cl.Image(name=path.name, path=str(path), display="inline") for path in paths]
+            await cl.Message(content="", elements=images).send()
 
+    async def on_done(self) -> None:
+        await self._finish_message()
+
+    def render_stats(self) -> dict:
+        """Token and frame counters of the Chainlit stream."""
+        return self.renderer.stats()
+
+    def turn_metrics(self) -> dict:
+        """Latency and volume of the turn: time to first token, total time, tokens, frames and bytes sent."""
+        stats = self.renderer.stats()
+        return {
+            "time_to_first_token_seconds": (
+                round(self.first_token_at - self.started, 3) if self.first_token_at is not None else None
+            ),
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "tokens": stats["tokens"],
+            "frames": stats["frames"],
+            "bytes_sent": self.bytes_sent,
+        }
 
     async def on_thread_run(self, run: ThreadRun) -> None:
         """Handle thread run events"""
@@ -70,6 +125,8 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
         pass
 
     async def on_error(self, data: str) -> None:
+        await self.terminal.flush()
+        await self.renderer.flush()
         print(f"An error occurred: {data}")
         await cl.Message(f"⚠️ Error occurred during streaming: {data}").send()
 
@@ -79,17 +136,3 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
         """Handle unhandled events."""
         # print(f"Unhandled Event Type: {event_type}, Data: {event_data}")
         print(f"Unhandled Event Type: {event_type}")
-
-
-
-async def on_thread_message(self, message: ThreadMessage) -> None:
-    if message.status == MessageStatus.COMPLETED:
-        content_list = message.content or []
-        for content in content_list:
-            if content["type"] == "text":
-                value = content["text"]["value"]
-                await cl.Message(value).send()
-            elif content["type"] == "image_file":
-                image_id = content["image_file"]["file_id"]
-                file = await self.project_client.files.get_file(file_id=image_id)
-                await cl.Message(content="📊 Generated Pie Chart:", files=[cl.File(name=file.name, path=file.url)]).send()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The workshop modules are imported by bare name, as the apps do.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,46 @@
+import random
+
+import pandas as pd
+
+from balance_engine import BALANCE_COLUMNS, compute_balances
+
+
+def _journals() -> pd.DataFrame:
+    rng = random.Random(7)
+    rows = []
+    for book in ["B1", "B2", "B3"]:
+        for day in range(1, 6):
+            for _ in range(rng.randint(1, 4)):
+                rows.append((book, f"2024-01-{day:02d}", rng.randint(-500, 500), rng.choice(["ann", "bob", "cy"])))
+    return pd.DataFrame(rows, columns=["SAP_BOOK_ID", "ENTRY_DATE", "VALUE", "POSTED_BY"])
+
+
+def _naive_balances(journals: pd.DataFrame, opening: dict) -> list:
+    balances = dict(opening)
+    rows = {}
+    for book, date, value, posted_by in journals.itertuples(index=False):
+        balances[book] = balances.get(book, 0) + value
+        _, _, _, change, count, _ = rows.get((book, date), (book, date, 0, 0, 0, None))
+        rows[(book, date)] = (book, date, balances[book], change + value, count + 1, posted_by)
+    return list(rows.values())
+
+
+def _chunks(journals: pd.DataFrame, size: int) -> list:
+    return [journals.iloc[start : start + size] for start in range(0, len(journals), size)]
+
+
+def test_matches_a_row_by_row_computation_for_any_chunk_size():
+    journals = _journals()
+    opening = {"B1": 1_000, "B2": -250}
+    expected = _naive_balances(journals, opening)
+
+    for size in (1, 2, 3, 7, len(journals)):
+        frames = list(compute_balances(_chunks(journals, size), opening))
+        result = pd.concat(frames, ignore_index=True)
+        assert list(result.columns) == BALANCE_COLUMNS
+        # A (book, date) split across chunks still yields exactly one row.
+        assert [tuple(row) for row in result.itertuples(index=False)] == expected, size
+
+
+def test_empty_input_yields_nothing():
+    assert list(compute_balances([], {"B1": 5})) == []
@@ -0,0 +1,42 @@
+import sqlite3
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from columnar_fetch import export_query, fetch_numpy, iter_record_batches
+
+
+def _mixed_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    # Untyped columns: SQLite stores each value with its own type.
+    conn.execute("CREATE TABLE mixed (amount, code, note)")
+    rows = [(i, i, None) for i in range(4)] + [(4.5, "X4", 7), (5, "X5", None)]
+    conn.executemany("INSERT INTO mixed VALUES (?, ?, ?)", rows)
+    return conn
+
+
+def test_later_batches_widen_inferred_types():
+    cursor = _mixed_db().execute("SELECT amount, code, note FROM mixed ORDER BY rowid")
+    batches = list(iter_record_batches(cursor, arraysize=2))
+
+    assert batches[0].schema.types == [pa.int64(), pa.int64(), pa.string()]
+    assert batches[-1].schema.types == [pa.float64(), pa.string(), pa.string()]
+    assert batches[2].column(2).to_pylist() == ["7", None]
+
+
+def test_fetch_numpy_unifies_widened_batches():
+    columns = fetch_numpy(_mixed_db().execute("SELECT amount, code FROM mixed ORDER BY rowid"), arraysize=2)
+
+    assert columns["amount"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.5, 5.0]
+    assert columns["code"].tolist() == ["0", "1", "2", "3", "X4", "X5"]
+
+
+def test_export_rewrites_the_file_with_the_widened_schema(tmp_path):
+    path = tmp_path / "mixed.parquet"
+
+    rows = export_query(_mixed_db(), "SELECT amount, code FROM mixed ORDER BY rowid", str(path), arraysize=2)
+
+    table = pq.read_table(path)
+    assert rows == 6 and table.num_rows == 6
+    assert table.schema.types == [pa.float64(), pa.string()]
+    assert table.column("code").to_pylist() == ["0", "1", "2", "3", "X4", "X5"]
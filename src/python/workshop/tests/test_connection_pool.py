@@ -0,0 +1,88 @@
+import asyncio
+import sqlite3
+
+import aiosqlite
+import pytest
+
+from connection_pool import SQLiteConnectionPool
+
+
+def _db_uri(tmp_path) -> str:
+    path = tmp_path / "pool.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    return f"file:{path}?mode=ro"
+
+
+def test_pool_is_bounded_and_reuses_connections(tmp_path):
+    pool = SQLiteConnectionPool(_db_uri(tmp_path), min_size=1, max_size=2)
+    peak = 0
+
+    async def query() -> list:
+        nonlocal peak
+        async with pool.acquire() as conn:
+            peak = max(peak, pool.metrics()["in_use"])
+            await asyncio.sleep(0.02)
+            async with conn.execute("SELECT a FROM t") as cursor:
+                return await cursor.fetchall()
+
+    async def run() -> list:
+        await pool.open()
+        try:
+            return await asyncio.gather(*(query() for _ in range(8)))
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == [[(1,)]] * 8
+    metrics = pool.metrics()
+    assert peak == 2
+    assert metrics["acquisitions"] == 8 and metrics["max_wait_seconds"] > 0
+    assert metrics["size"] == 0 and metrics["in_use"] == 0
+
+
+def test_connections_are_read_only(tmp_path):
+    pool = SQLiteConnectionPool(_db_uri(tmp_path), min_size=0, max_size=1)
+
+    async def run() -> None:
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute("DELETE FROM t")
+        finally:
+            await pool.close()
+
+    with pytest.raises(aiosqlite.OperationalError):
+        asyncio.run(run())
+
+
+def test_failed_health_check_replaces_the_connection(tmp_path):
+    pool = SQLiteConnectionPool(_db_uri(tmp_path), min_size=1, max_size=1, health_check_interval=0)
+
+    async def run() -> list:
+        await pool.open()
+        try:
+            async with pool.acquire() as conn:
+                await conn.close()
+            async with pool.acquire() as conn:
+                async with conn.execute("SELECT a FROM t") as cursor:
+                    return await cursor.fetchall()
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == [(1,)]
+    assert pool.metrics()["health_check_failures"] == 1
+
+
+def test_closed_pool_refuses_queries(tmp_path):
+    pool = SQLiteConnectionPool(_db_uri(tmp_path))
+
+    async def run() -> None:
+        await pool.open()
+        await pool.close()
+        async with pool.acquire():
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
@@ -0,0 +1,36 @@
+import hashlib
+
+from file_cache import FileCache
+
+
+def _put(cache: FileCache, tmp_path, file_id: str, data: bytes):
+    download = tmp_path / f"{file_id}.download"
+    download.write_bytes(data)
+    target = tmp_path / "files" / f"{file_id}.png"
+    target.parent.mkdir(exist_ok=True)
+    cache.put(file_id, download, hashlib.sha256(data).hexdigest(), len(data), target)
+    return target
+
+
+def test_serves_cached_file_to_a_new_target(tmp_path):
+    cache = FileCache(tmp_path / "cache/file_cache.json", tmp_path / "cache/files")
+    _put(cache, tmp_path, "a", b"chart")
+
+    other = tmp_path / "files" / "copy.png"
+    assert cache.get("a", other)
+    assert other.read_bytes() == b"chart"
+    assert not cache.get("missing", tmp_path / "files" / "missing.png")
+
+
+def test_eviction_keeps_the_users_copies(tmp_path):
+    cache = FileCache(tmp_path / "cache/file_cache.json", tmp_path / "cache/files", max_bytes=10)
+    first = _put(cache, tmp_path, "a", b"12345678")
+    second = _put(cache, tmp_path, "b", b"abcdefgh")
+
+    assert cache.stats()["evictions"] == 1
+    assert not cache.get("a", tmp_path / "files" / "again.png")
+    # Only the cache's own copy was removed.
+    assert first.read_bytes() == b"12345678"
+    assert second.read_bytes() == b"abcdefgh"
+    # The index survives a restart.
+    assert FileCache(tmp_path / "cache/file_cache.json", tmp_path / "cache/files").get("b", second)
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from FinancialData import DATA_BASE, FinancialData
+from query_cache import QueryResultCache, is_cacheable, normalize_sql
+from utilities import Utilities
+
+
+def test_normalizes_case_and_whitespace_outside_literals():
+    assert normalize_sql("SELECT  *\n FROM t WHERE a = 'X  Y';") == "select * from t where a = 'X  Y'"
+    assert normalize_sql("select * from t where a = 'x  y'") != normalize_sql("select * from t where a = 'X  Y'")
+
+
+def test_only_deterministic_reads_are_cacheable():
+    assert is_cacheable("WITH x AS (SELECT 1) SELECT * FROM x")
+    assert not is_cacheable("SELECT random()")
+    assert not is_cacheable("SELECT date('now')")
+    assert not is_cacheable("DELETE FROM t")
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = QueryResultCache(max_entries=2)
+    cache.put("SELECT 1", "one", 1)
+    cache.put("SELECT 2", "two", 1)
+    assert cache.get("select   1", 1) == "one"
+    cache.put("SELECT 3", "three", 1)
+
+    assert cache.get("SELECT 2", 1) is None
+    assert cache.get("SELECT 1", 1) == "one"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_version_change_and_ttl_drop_entries():
+    cache = QueryResultCache(ttl=60)
+    cache.put("SELECT 1", "one", "v1")
+    assert cache.get("SELECT 1", "v2") is None
+    assert cache.stats()["invalidations"] == 1
+
+    expired = QueryResultCache(ttl=-1)
+    expired.put("SELECT 1", "one", "v1")
+    assert expired.get("SELECT 1", "v1") is None
+
+
+def test_byte_cap_is_respected():
+    cache = QueryResultCache(max_bytes=2_000)
+    cache.put("SELECT 1", "x" * 5_000, 1)
+    assert cache.stats()["entries"] == 0
+    for i in range(10):
+        cache.put(f"SELECT {i}", "x" * 300, 1)
+    assert cache.stats()["bytes"] <= 2_000
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    (tmp_path / "database").mkdir()
+    conn = sqlite3.connect(tmp_path / DATA_BASE)
+    conn.execute("CREATE TABLE t (a INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(Utilities, "shared_files_path", property(lambda self: tmp_path))
+    return tmp_path
+
+
+def test_backend_serves_repeats_from_cache_until_the_database_changes(shared_dir):
+    backend = FinancialData(Utilities())
+    query = "SELECT sum(a) AS total FROM t"
+
+    async def run() -> list:
+        await backend.connect()
+        try:
+            results = [await backend.async_fetch_data_using_sqlite_query(query)]
+            results.append(await backend.async_fetch_data_using_sqlite_query(query.lower()))
+            conn = sqlite3.connect(shared_dir / DATA_BASE)
+            conn.execute("INSERT INTO t VALUES (41)")
+            conn.commit()
+            conn.close()
+            results.append(await backend.async_fetch_data_using_sqlite_query(query))
+            return results
+        finally:
+            await backend.close()
+
+    first, repeated, after_write = asyncio.run(run())
+    assert first == repeated
+    assert json.loads(after_write)["data"] == [[42]]
+    stats = backend.cache_stats()
+    assert stats["hits"] == 1 and stats["invalidations"] == 1
@@ -0,0 +1,48 @@
+import json
+import sqlite3
+import time
+
+from result_serializer import NO_RESULTS, SplitJsonWriter, serialize_cursor
+
+
+def _cursor(rows: int) -> sqlite3.Cursor:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER, label TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"row {i}") for i in range(rows)])
+    return conn.execute("SELECT id, label FROM t ORDER BY id")
+
+
+def test_matches_the_pandas_split_layout():
+    result = json.loads(serialize_cursor(_cursor(3), batch_size=2))
+    assert result == {"columns": ["id", "label"], "data": [[0, "row 0"], [1, "row 1"], [2, "row 2"]]}
+
+
+def test_row_limit_truncates_and_says_so():
+    result = json.loads(serialize_cursor(_cursor(10), batch_size=4, max_rows=5))
+    assert [row[0] for row in result["data"]] == [0, 1, 2, 3, 4]
+    assert result["truncated"]["reason"] == "max_rows"
+    assert result["truncated"]["rows_returned"] == 5
+
+
+def test_byte_limit_keeps_whole_rows_within_budget():
+    output = serialize_cursor(_cursor(100), batch_size=50, max_bytes=200, max_rows=None)
+    result = json.loads(output)
+    assert result["truncated"]["reason"] == "max_bytes"
+    assert 0 < len(result["data"]) < 100
+    # The budget covers the rows; only the truncation notice is added on top.
+    del result["truncated"]
+    assert len(json.dumps(result, separators=(",", ":"))) <= 200
+
+
+def test_deadline_stops_the_fetch():
+    result = json.loads(serialize_cursor(_cursor(10), batch_size=2, deadline=time.monotonic() - 1))
+    assert len(result["data"]) == 2
+    assert result["truncated"]["reason"] == "timeout"
+
+
+def test_empty_results_and_non_finite_floats():
+    assert serialize_cursor(_cursor(0)) == NO_RESULTS
+
+    writer = SplitJsonWriter(["value"])
+    writer.write_rows([(1.5,), (float("nan"),), (float("inf"),)])
+    assert json.loads(writer.result())["data"] == [[1.5], [None], [None]]
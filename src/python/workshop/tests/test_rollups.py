@@ -0,0 +1,38 @@
+import sqlite3
+
+from rollups import refresh_rollups
+
+
+def _load_journal(conn: sqlite3.Connection, rows: int, value: int) -> None:
+    conn.executemany(
+        "INSERT INTO journaldata (SAP_BOOK_ID, ENTRY_DATE, TRANSACTION_TYPE, VALUE) VALUES (?, ?, ?, ?)",
+        [("B1", "2024-01-15", "Invoice", value)] * rows,
+    )
+    conn.commit()
+
+
+def _monthly_totals(conn: sqlite3.Connection) -> list:
+    return conn.execute("SELECT TOTAL_VALUE, JOURNAL_COUNT FROM journal_rollup_monthly").fetchall()
+
+
+def test_incremental_refresh_merges_new_rows():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE journaldata (SAP_BOOK_ID TEXT, ENTRY_DATE TEXT, TRANSACTION_TYPE TEXT, VALUE INTEGER)")
+    _load_journal(conn, 10, 5)
+    refresh_rollups(conn, batch_rows=3)
+    _load_journal(conn, 4, 5)
+
+    assert refresh_rollups(conn)["journal_rollup_monthly"] == 4
+    assert _monthly_totals(conn) == [(70, 14)]
+
+
+def test_reload_with_fewer_rows_rebuilds():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE journaldata (SAP_BOOK_ID TEXT, ENTRY_DATE TEXT, TRANSACTION_TYPE TEXT, VALUE INTEGER)")
+    _load_journal(conn, 10, 5)
+    refresh_rollups(conn)
+    conn.execute("DELETE FROM journaldata")
+    _load_journal(conn, 3, 7)
+
+    assert refresh_rollups(conn)["journal_rollup_monthly"] == 3
+    assert _monthly_totals(conn) == [(21, 3)]
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from FinancialDataSQLServer import FinancialDataSQLServer
+from utilities import Utilities
+
+INFINITE_QUERY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n;"
+
+
+def _make_db(path) -> str:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE journaldata (ENTRY_DATE TEXT, TRANSACTION_TYPE TEXT, TRANSACTION_CURRENCY TEXT, AMOUNT REAL)")
+    conn.executemany(
+        "INSERT INTO journaldata VALUES (?, ?, ?, ?)",
+        [(f"202{i % 3}-01-15", "Invoice" if i % 2 else "Payment", "USD", i) for i in range(100)],
+    )
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def _backend(db: str, **kwargs) -> FinancialDataSQLServer:
+    return FinancialDataSQLServer(Utilities(), connect=lambda: sqlite3.connect(db), **kwargs)
+
+
+def test_pooled_queries_run_concurrently(tmp_path):
+    db = _make_db(tmp_path / "standin.db")
+    backend = _backend(db, pool_size=3)
+
+    async def run():
+        await backend.connect()
+        try:
+            results = await asyncio.gather(
+                *(backend.async_fetch_data_using_sqlserver_query(f"SELECT {i} AS n, count(*) FROM journaldata") for i in range(9))
+            )
+        finally:
+            await backend.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [json.loads(result)["data"] for result in results] == [[[i, 100]] for i in range(9)]
+    metrics = backend.pool_metrics()
+    assert metrics["size"] == 3 and metrics["acquisitions"] == 9 and metrics["failures"] == 0
+
+
+def test_reconnects_after_a_lost_connection(tmp_path):
+    db = _make_db(tmp_path / "standin.db")
+    backend = _backend(
+        db, pool_size=1, is_disconnect_error=lambda error: isinstance(error, sqlite3.ProgrammingError)
+    )
+
+    async def run():
+        await backend.connect()
+        try:
+            # Drop the worker's connection behind the pool's back.
+            await backend.pool.run(lambda conn: conn.close())
+            return await backend.async_fetch_data_using_sqlserver_query("SELECT count(*) AS n FROM journaldata")
+        finally:
+            await backend.close()
+
+    assert json.loads(asyncio.run(run()))["data"] == [[100]]
+    assert backend.pool_metrics()["reconnects"] == 1
+
+
+def test_runaway_query_is_stopped_by_the_timeout(tmp_path):
+    db = _make_db(tmp_path / "standin.db")
+    backend = _backend(db, query_timeout=0.5)
+
+    async def run():
+        await backend.connect()
+        try:
+            start = time.monotonic()
+            result = await backend.async_fetch_data_using_sqlserver_query(INFINITE_QUERY)
+            return result, time.monotonic() - start
+        finally:
+            await backend.close()
+
+    result, elapsed = asyncio.run(run())
+    assert "time limit" in json.loads(result)[backend.error_key]
+    assert elapsed < 5
+
+
+def test_timeout_while_fetching_is_not_complete(tmp_path):
+    db = _make_db(tmp_path / "standin.db")
+    backend = _backend(db, query_timeout=0.5, result_max_rows=None, result_max_bytes=None)
+
+    async def run():
+        await backend.connect()
+        try:
+            return await backend._execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT i FROM n;")
+        finally:
+            await backend.close()
+
+    result, complete = asyncio.run(run())
+    assert not complete
+    assert json.loads(result)["truncated"]["reason"] == "timeout"
+
+
+def test_database_info_on_the_stand_in(tmp_path):
+    db = _make_db(tmp_path / "standin.db")
+    backend = _backend(db)
+
+    async def run():
+        await backend.connect()
+        try:
+            return await backend.get_database_info()
+        finally:
+            await backend.close()
+
+    info = asyncio.run(run())
+    assert "Table journaldata Schema: Columns: ENTRY_DATE: TEXT" in info
+    assert "Transaction Types: " in info and "Currencies: USD" in info
+    assert "Years: 2020, 2021, 2022" in info
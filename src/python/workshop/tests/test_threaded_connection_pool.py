@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from threaded_connection_pool import ThreadBoundConnectionPool
+
+
+class FlakyError(Exception):
+    pass
+
+
+def _connect() -> sqlite3.Connection:
+    # sqlite3 refuses to use a connection from any thread but the one that opened it.
+    return sqlite3.connect(":memory:")
+
+
+def test_each_connection_stays_on_its_own_thread():
+    pool = ThreadBoundConnectionPool(_connect, size=2)
+    peak = active = 0
+    lock = threading.Lock()
+
+    def query(conn: sqlite3.Connection) -> tuple:
+        nonlocal peak, active
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return id(conn), threading.current_thread().name, conn.execute("SELECT 1").fetchone()[0]
+
+    async def run() -> list:
+        await pool.open()
+        try:
+            return await asyncio.gather(*(pool.run(query) for _ in range(8)))
+        finally:
+            await pool.close()
+
+    results = asyncio.run(run())
+    threads_per_connection = {}
+    for conn_id, thread, value in results:
+        assert value == 1
+        threads_per_connection.setdefault(conn_id, set()).add(thread)
+    assert len(threads_per_connection) == 2
+    assert all(len(threads) == 1 for threads in threads_per_connection.values())
+    assert peak == 2
+    metrics = pool.metrics()
+    assert metrics["acquisitions"] == 8 and metrics["in_use"] == 0 and metrics["max_wait_seconds"] > 0
+
+
+def test_disconnect_reconnects_and_retries_once():
+    opened = []
+
+    def connect() -> sqlite3.Connection:
+        opened.append(1)
+        return _connect()
+
+    pool = ThreadBoundConnectionPool(connect, size=1, is_disconnect=lambda e: isinstance(e, FlakyError))
+    calls = []
+
+    def query(conn: sqlite3.Connection) -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            raise FlakyError("connection reset")
+        return conn.execute("SELECT 2").fetchone()[0]
+
+    async def run() -> int:
+        try:
+            return await pool.run(query)
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == 2
+    assert len(opened) == 2
+    metrics = pool.metrics()
+    assert metrics["reconnects"] == 1 and metrics["failures"] == 0
+
+
+def test_other_errors_propagate_and_free_the_worker():
+    pool = ThreadBoundConnectionPool(_connect, size=1)
+
+    async def run() -> int:
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                await pool.run(lambda conn: conn.execute("SELECT * FROM missing"))
+            return await pool.run(lambda conn: conn.execute("SELECT 3").fetchone()[0])
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == 3
+    metrics = pool.metrics()
+    assert metrics["failures"] == 1 and metrics["reconnects"] == 0
+
+
+def test_closed_pool_refuses_queries():
+    pool = ThreadBoundConnectionPool(_connect, size=1)
+
+    async def run() -> None:
+        await pool.open()
+        await pool.close()
+        await pool.run(lambda conn: None)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    with pytest.raises(ValueError):
+        ThreadBoundConnectionPool(_connect, size=0)
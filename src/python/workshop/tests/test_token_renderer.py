@@ -0,0 +1,50 @@
+import asyncio
+
+from token_renderer import BufferedTokenRenderer
+
+
+async def _stream(renderer: BufferedTokenRenderer, tokens: int, gap: float) -> None:
+    for i in range(tokens):
+        await renderer.write(f"<{i}>")
+        await asyncio.sleep(gap)
+    await renderer.close()
+
+
+def test_batches_tokens_and_keeps_order():
+    frames = []
+    renderer = BufferedTokenRenderer(frames.append, flush_interval=0.03)
+    asyncio.run(_stream(renderer, 200, 0.002))
+
+    assert "".join(frames) == "".join(f"<{i}>" for i in range(200))
+    assert renderer.stats()["tokens_per_frame"] >= 4
+
+
+def test_slow_sink_still_batches():
+    frames = []
+
+    async def slow_sink(text: str) -> None:
+        await asyncio.sleep(0.045)
+        frames.append(text)
+
+    renderer = BufferedTokenRenderer(slow_sink, flush_interval=0.03)
+    asyncio.run(_stream(renderer, 200, 0.002))
+
+    assert "".join(frames) == "".join(f"<{i}>" for i in range(200))
+    assert renderer.stats()["tokens_per_frame"] >= 4
+
+
+def test_max_chars_flushes_early():
+    frames = []
+    renderer = BufferedTokenRenderer(frames.append, flush_interval=60, max_chars=10)
+    asyncio.run(_stream(renderer, 10, 0))
+
+    assert frames[0] == "<0><1><2><3>"
+    assert "".join(frames) == "".join(f"<{i}>" for i in range(10))
+
+
+def test_zero_interval_renders_every_token():
+    frames = []
+    renderer = BufferedTokenRenderer(frames.append, flush_interval=0)
+    asyncio.run(_stream(renderer, 5, 0))
+
+    assert frames == [f"<{i}>" for i in range(5)]
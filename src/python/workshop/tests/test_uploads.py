@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from azure.core.exceptions import ServiceRequestError
+
+import utilities
+from fake_project_client import FakeLatency, FakeProjectClient
+from utilities import Utilities
+
+FILES = [f"datasheet/file{i}.txt" for i in range(6)]
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    (tmp_path / "datasheet").mkdir()
+    for i, file in enumerate(FILES):
+        (tmp_path / file).write_text(f"contents of file {i}\n" * 100)
+    monkeypatch.setattr(Utilities, "shared_files_path", property(lambda self: tmp_path))
+    monkeypatch.setattr(utilities, "UPLOAD_BACKOFF_SECONDS", 0)
+    return tmp_path
+
+
+def _client() -> FakeProjectClient:
+    return FakeProjectClient(latency=FakeLatency(scale=0.1, seed=1))
+
+
+def _track_concurrency(client: FakeProjectClient) -> dict:
+    state = {"active": 0, "peak": 0}
+    upload_file = client.agents.upload_file
+
+    async def tracked(*args, **kwargs):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            return await upload_file(*args, **kwargs)
+        finally:
+            state["active"] -= 1
+
+    client.agents.upload_file = tracked
+    return state
+
+
+def test_uploads_run_concurrently_within_the_limit(shared_dir, tmp_path_factory):
+    client = _client()
+    state = _track_concurrency(client)
+    util = Utilities(cache_root=tmp_path_factory.mktemp("cache"))
+
+    vector_store = asyncio.run(util.create_vector_store(client, FILES, "docs", max_concurrency=3))
+
+    assert state["peak"] == 3
+    assert client.agents.calls["upload_file"] == len(FILES)
+    # File IDs keep the order of the requested files.
+    names = [asyncio.run(client.agents.get_file(file_id)).filename for file_id in vector_store.file_ids]
+    assert names == [file.split("/")[-1] for file in FILES]
+
+
+def test_repeat_runs_reuse_uploads_and_the_vector_store(shared_dir, tmp_path_factory):
+    client = _client()
+    cache_root = tmp_path_factory.mktemp("cache")
+
+    first = asyncio.run(Utilities(cache_root=cache_root).create_vector_store(client, FILES, "docs"))
+    # A new instance reads the persisted cache, as after a restart.
+    second = asyncio.run(Utilities(cache_root=cache_root).create_vector_store(client, FILES, "docs"))
+
+    assert second.id == first.id
+    assert client.agents.calls["upload_file"] == len(FILES)
+    assert client.agents.calls["create_vector_store_and_poll"] == 1
+
+    # Changed content is uploaded again and gets a new vector store.
+    (shared_dir / FILES[0]).write_text("edited")
+    third = asyncio.run(Utilities(cache_root=cache_root).create_vector_store(client, FILES, "docs"))
+    assert third.id != first.id
+    assert client.agents.calls["upload_file"] == len(FILES) + 1
+
+
+def test_transient_upload_failures_are_retried(shared_dir, tmp_path_factory):
+    client = _client()
+    upload_file = client.agents.upload_file
+    failures = {"left": 2}
+
+    async def flaky(*args, **kwargs):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise ServiceRequestError("connection reset")
+        return await upload_file(*args, **kwargs)
+
+    client.agents.upload_file = flaky
+    util = Utilities(cache_root=tmp_path_factory.mktemp("cache"))
+
+    vector_store = asyncio.run(util.create_vector_store(client, FILES[:2], "docs"))
+
+    assert len(vector_store.file_ids) == 2 and failures["left"] == 0
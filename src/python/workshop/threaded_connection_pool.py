@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+THREAD_POOL_SIZE = 4
+
+
+def never_disconnect(error: BaseException) -> bool:
+    return False
+
+
+class ConnectionWorker:
+    """A DB-API connection bound to one dedicated thread.
+
+    The connection is opened, used and closed only on the worker's thread, so
+    drivers that must not share a connection between threads (pyodbc, sqlite3)
+    are safe to use from asyncio.
+    """
+
+    def __init__(self, name: str, connect: Callable[[], Any]) -> None:
+        self.name = name
+        self._connect = connect
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self.conn: Any = None
+
+    def _ensure_connection(self) -> Any:
+        if self.conn is None:
+            self.conn = self._connect()
+            logger.debug("%s: connection opened.", self.name)
+        return self.conn
+
+    def _reset(self) -> None:
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug("%s: error closing connection: %s", self.name, e)
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(connection, *args) on the worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._ensure_connection(), *args))
+
+    async def open(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._ensure_connection)
+
+    async def reset(self) -> None:
+        """Close the connection; the next call reconnects."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._reset)
+
+    async def close(self) -> None:
+        await self.reset()
+        self._executor.shutdown(wait=False)
+
+
+class ThreadBoundConnectionPool:
+    """Fixed-size pool of thread-bound connections for blocking DB-API drivers.
+
+    Each of the ``size`` workers owns one connection and one thread, which also
+    caps the number of concurrent queries at ``size``. A call that fails with
+    an error ``is_disconnect`` recognises reconnects that worker and is retried
+    once.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        size: int = THREAD_POOL_SIZE,
+        is_disconnect: Callable[[BaseException], bool] = never_disconnect,
+        name: str = "db-worker",
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"Invalid pool size: size={size}")
+        self.size = size
+        self.is_disconnect = is_disconnect
+        self._workers = [ConnectionWorker(f"{name}-{i}", connect) for i in range(size)]
+        self._idle: Optional[asyncio.Queue] = None
+        self._waiting = 0
+        self._closed = False
+        # Metrics
+        self._acquisitions = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._reconnects = 0
+        self._failures = 0
+
+    def _idle_queue(self) -> asyncio.Queue:
+        # Created lazily so the queue binds to the running event loop.
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+        return self._idle
+
+    async def open(self) -> None:
+        """Open every worker's connection concurrently."""
+        self._closed = False
+        self._idle_queue()
+        await asyncio.gather(*(worker.open() for worker in self._workers))
+
+    async def close(self) -> None:
+        """Close all connections and stop the worker threads."""
+        self._closed = True
+        await asyncio.gather(*(worker.close() for worker in self._workers), return_exceptions=True)
+        self._workers = [ConnectionWorker(worker.name, worker._connect) for worker in self._workers]
+        self._idle = None
+        logger.debug("Thread-bound connection pool closed.")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(connection, *args) on a free worker and return its result."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+
+        idle = self._idle_queue()
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            worker = await idle.get()
+        finally:
+            self._waiting -= 1
+        wait = time.perf_counter() - start
+        self._acquisitions += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+        try:
+            try:
+                return await worker.submit(fn, *args)
+            except Exception as e:
+                if not self.is_disconnect(e):
+                    raise
+                logger.warning("%s: connection lost (%s); reconnecting.", worker.name, e)
+                self._reconnects += 1
+                await worker.reset()
+                return await worker.submit(fn, *args)
+        except Exception:
+            self._failures += 1
+            raise
+        finally:
+            idle.put_nowait(worker)
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the pool metrics."""
+        idle = self._idle.qsize() if self._idle is not None else self.size
+        return {
+            "size": self.size,
+            "in_use": self.size - idle,
+            "idle": idle,
+            "waiting": self._waiting,
+            "acquisitions": self._acquisitions,
+            "total_wait_seconds": round(self._total_wait, 6),
+            "avg_wait_seconds": round(self._total_wait / self._acquisitions, 6) if self._acquisitions else 0.0,
+            "max_wait_seconds": round(self._max_wait, 6),
+            "reconnects": self._reconnects,
+            "failures": self._failures,
+        }
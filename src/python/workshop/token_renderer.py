@@ -0,0 +1,94 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Optional
+
+# Longest time a streamed token waits in the buffer before it is rendered.
+TOKEN_FLUSH_INTERVAL = 0.03
+# Buffered characters that trigger a flush before the interval is up.
+TOKEN_FLUSH_CHARS = 512
+
+
+class BufferedTokenRenderer:
+    """Coalesce streamed tokens into fewer terminal writes or websocket frames.
+
+    Tokens are appended to a buffer that is handed to ``sink`` (a plain or
+    async callable taking the text) once the oldest buffered token has waited
+    ``flush_interval`` seconds or ``max_chars`` characters are waiting. The
+    window starts at the first buffered token rather than at the last flush,
+    so a slow sink (a congested websocket) does not leave every following
+    token past its window. A timer flushes the tail when the stream pauses,
+    so no token waits longer than ``flush_interval``. ``flush_interval=0``
+    renders every token.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[str], Any],
+        flush_interval: float = TOKEN_FLUSH_INTERVAL,
+        max_chars: int = TOKEN_FLUSH_CHARS,
+    ) -> None:
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.max_chars = max_chars
+        self._buffer: list[str] = []
+        self._buffered_chars = 0
+        self._window_start = 0.0
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # Metrics
+        self.tokens = 0
+        self.frames = 0
+        self.chars = 0
+
+    async def write(self, text: str) -> None:
+        """Buffer a token, flushing when the time window or size limit is reached."""
+        if not text:
+            return
+        now = time.perf_counter()
+        if not self._buffer:
+            self._window_start = now
+        self._buffer.append(text)
+        self._buffered_chars += len(text)
+        self.tokens += 1
+
+        elapsed = now - self._window_start
+        if self._buffered_chars >= self.max_chars or elapsed >= self.flush_interval:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later(self.flush_interval - elapsed))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Render everything buffered so far as one frame."""
+        async with self._lock:
+            if self._timer is not None and self._timer is not asyncio.current_task():
+                self._timer.cancel()
+            self._timer = None
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffered_chars = 0
+            self.frames += 1
+            self.chars += len(text)
+            result = self.sink(text)
+            if inspect.isawaitable(result):
+                await result
+
+    async def close(self) -> None:
+        """Flush the remaining tokens, e.g. at the end of a message or run."""
+        await self.flush()
+
+    def stats(self) -> dict:
+        """Return the token and frame counters."""
+        return {
+            "tokens": self.tokens,
+            "frames": self.frames,
+            "chars": self.chars,
+            "tokens_per_frame": round(self.tokens / self.frames, 2) if self.frames else 0.0,
+        }
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from json_store import JsonStore
+from schema_cache import file_identity
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CACHE_FILE = "cache/upload_cache.json"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def vector_store_key(name: str, file_ids: list[str]) -> str:
+    """Cache key of a vector store built from the given uploaded files."""
+    encoded = json.dumps({"name": name, "file_ids": sorted(file_ids)}).encode("utf-8")
+    return f"vector_store:{hashlib.sha256(encoded).hexdigest()}"
+
+
+class UploadCache:
+    """Content-addressed record of uploaded files and the vector stores built from them.
+
+    Maps a key (the SHA-256 of a file's content, or of the file IDs a vector
+    store was built from) to the remote ID and persists it in a JSON file, so
+    the same document is uploaded and indexed once rather than per session or
+    per restart. Remote IDs are validated lazily, on first use in a process; an
+    entry whose remote object no longer exists is dropped so it is rebuilt.
+    """
+
+    def __init__(self, cache_path: Path) -> None:
+        self.cache_path = Path(cache_path)
+        self._store = JsonStore(self.cache_path, "upload cache")
+        self._entries: Optional[dict] = None
+        # (path, file identity) -> content digest, so unchanged files are hashed once.
+        self._digests: dict[tuple, str] = {}
+        # key -> remote object already validated in this process.
+        self._validated: dict[str, Any] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def entries(self) -> dict:
+        if self._entries is None:
+            self._entries = self._store.read()
+        return self._entries
+
+    async def digest(self, path: Path) -> str:
+        """Content digest of a file, rehashed only when the file changed."""
+        identity = file_identity(str(path))
+        memo_key = (str(Path(path).resolve()), json.dumps(identity, sort_keys=True))
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            digest = await asyncio.to_thread(file_digest, path)
+            self._digests[memo_key] = digest
+        return digest
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """Per-key lock, so concurrent sessions build a missing entry only once."""
+        return self._locks.setdefault(key, asyncio.Lock())
+
+    async def validated(
+        self,
+        key: str,
+        fetch: Callable[[str], Awaitable[Any]],
+        usable: Callable[[Any], bool] = lambda remote: True,
+    ) -> Optional[Any]:
+        """Return the cached remote object for key, or None when there is none or it is gone."""
+        remote = self._validated.get(key)
+        if remote is not None:
+            return remote
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            remote = await fetch(entry["id"])
+        except ResourceNotFoundError:
+            remote = None
+        if remote is None or not usable(remote):
+            logger.info("Cached upload %s (%s) is no longer usable; rebuilding it.", key, entry["id"])
+            self.forget(key)
+            return None
+        self._validated[key] = remote
+        return remote
+
+    def put(self, key: str, remote: Any, source: str = "") -> None:
+        """Record the remote object created for key."""
+        self._validated[key] = remote
+        self.entries[key] = {"id": remote.id, "source": source}
+        self._store.write(self.entries)
+
+    def forget(self, key: str) -> None:
+        self._validated.pop(key, None)
+        if self.entries.pop(key, None) is not None:
+            self._store.write(self.entries)
@@ -1,12 +1,51 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
 from pathlib import Path
+from typing import Callable, Optional
 
 from azure.ai.projects.aio import AIProjectClient
 from azure.ai.projects.models import ThreadMessage
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
 
+from file_cache import FILE_CACHE_DIR, FILE_CACHE_INDEX, FileCache
 from terminal_colors import TerminalColors as tc
+from upload_cache import UPLOAD_CACHE_FILE, UploadCache, vector_store_key
+
+logger = logging.getLogger(__name__)
+
+# Vector store states that can no longer be searched.
+UNUSABLE_VECTOR_STORE_STATES = {"expired"}
+# Maximum number of files create_vector_store uploads at once.
+UPLOAD_CONCURRENCY = 4
+UPLOAD_ATTEMPTS = 4
+# Delay before the first retry of a failed upload; doubled for each further retry.
+UPLOAD_BACKOFF_SECONDS = 1.0
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Maximum number of attachments get_files downloads at once.
+DOWNLOAD_CONCURRENCY = 4
+# Downloaded chunks are buffered up to this size before each (off-loop) disk write.
+DOWNLOAD_WRITE_BYTES = 1024 * 1024
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed service call is worth retrying (connection problems, throttling, server errors)."""
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+    return isinstance(error, HttpResponseError) and error.status_code in RETRYABLE_STATUS_CODES
 
 
 class Utilities:
+    def __init__(self, cache_root: Optional[Path] = None) -> None:
+        # The local caches of remote IDs live under cache_root, the shared files directory by default.
+        self.cache_root = Path(cache_root) if cache_root is not None else self.shared_files_path
+        # Uploads and vector stores are reused across sessions and restarts while the file content is unchanged.
+        self.upload_cache = UploadCache(self.cache_root / UPLOAD_CACHE_FILE)
+        # Downloaded files are kept by file ID and content hash, up to a size cap.
+        self.file_cache = FileCache(self.cache_root / FILE_CACHE_INDEX, self.cache_root / FILE_CACHE_DIR)
+
     # propert to get the relative path of shared files
     @property
     def shared_files_path(self) -> Path:
@@ -27,12 +66,22 @@ class Utilities:
         """Print a message in purple."""
         print(f"{tc.PURPLE}{msg}{tc.RESET}")
 
+    def log_msg_yellow(self, msg: str) -> None:
+        """Print a message in yellow."""
+        print(f"{tc.YELLOW}{msg}{tc.RESET}")
+
     def log_token_blue(self, msg: str) -> None:
         """Print a token in blue."""
         print(f"{tc.BLUE}{msg}{tc.RESET}", end="", flush=True)
 
-    async def get_file(self, project_client: AIProjectClient, file_id: str, attachment_name: str) -> None:
-        """Retrieve the file and save it to the local disk."""
+    async def get_file(self, project_client: AIProjectClient, file_id: str, attachment_name: str) -> Path:
+        """Retrieve the file and save it to the local disk.
+
+        Files downloaded before are served from the local file cache. Disk writes
+        run in a worker thread so a large download does not block the event
+        loop, and the file is written under a temporary name and moved into
+        place, so readers never see a partial file.
+        """
         self.log_msg_green(f"Getting file with ID: {file_id}")
 
         attachment_part = attachment_name.split(":")[-1]
@@ -46,55 +95,178 @@ class Utilities:
         folder_path.mkdir(parents=True, exist_ok=True)
         file_path = folder_path / file_name
 
-        # Save the file using a synchronous context manager
-        with file_path.open("wb") as file:
+        async with self.file_cache.lock(file_id):
+            if await asyncio.to_thread(self.file_cache.get, file_id, file_path):
+                self.log_msg_green(f"File served from cache: {file_path}")
+                return file_path
+
+            start = time.perf_counter()
+            tmp_path, sha256, size = await self._download(project_client, file_id)
+            await asyncio.to_thread(self.file_cache.put, file_id, tmp_path, sha256, size, file_path)
+
+        elapsed = time.perf_counter() - start
+        throughput = size / elapsed / 1_000_000 if elapsed > 0 else 0.0
+        self.log_msg_green(f"File saved to {file_path} ({size:,} bytes in {elapsed:.2f}s, {throughput:.2f} MB/s)")
+        return file_path
+
+    async def _download(self, project_client: AIProjectClient, file_id: str) -> tuple[Path, str, int]:
+        """Download a file to a temporary path in the cache directory, hashing it on the way."""
+        self.file_cache.blob_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_cache.blob_dir / f"{file_id}.{uuid.uuid4().hex}.tmp"
+        digest = hashlib.sha256()
+        size = 0
+
+        def write(file, data: bytes) -> None:
+            file.write(data)
+            digest.update(data)
+
+        file = await asyncio.to_thread(tmp_path.open, "wb")
+        try:
+            buffer = bytearray()
             async for chunk in await project_client.agents.get_file_content(file_id):
-                file.write(chunk)
+                buffer += chunk
+                if len(buffer) >= DOWNLOAD_WRITE_BYTES:
+                    await asyncio.to_thread(write, file, bytes(buffer))
+                    size += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(write, file, bytes(buffer))
+                size += len(buffer)
+            await asyncio.to_thread(file.close)
+        except BaseException:
+            file.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return tmp_path, digest.hexdigest(), size
 
-        self.log_msg_green(f"File saved to {file_path}")
+    async def get_files(
+        self, message: ThreadMessage, project_client: AIProjectClient, max_concurrency: int = DOWNLOAD_CONCURRENCY
+    ) -> list[Path]:
+        """Get the image files from the message and download them concurrently.
 
-    async def get_files(self, message: ThreadMessage, project_client: AIProjectClient) -> None:
-        """Get the image files from the message and kickoff download."""
+        Returns the local paths in message order, without the files that could not be downloaded.
+        """
+        downloads = []
         if message.image_contents:
             for index, image in enumerate(message.image_contents, start=0):
                 attachment_name = (
                     "unknown" if not message.file_path_annotations else message.file_path_annotations[index].text + ".png"
                 )
-                await self.get_file(project_client, image.image_file.file_id, attachment_name)
+                downloads.append((image.image_file.file_id, attachment_name))
         elif message.attachments:
             for index, attachment in enumerate(message.attachments, start=0):
                 attachment_name = (
                     "unknown" if not message.file_path_annotations else message.file_path_annotations[index].text
                 )
-                await self.get_file(project_client, attachment.file_id, attachment_name)
+                downloads.append((attachment.file_id, attachment_name))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def download(file_id: str, attachment_name: str) -> Optional[Path]:
+            async with semaphore:
+                try:
+                    return await self.get_file(project_client, file_id, attachment_name)
+                except Exception as e:
+                    # One failed attachment should not cancel the others.
+                    logger.error("Could not download file %s: %s", file_id, e)
+                    return None
+
+        paths = await asyncio.gather(*(download(file_id, attachment_name) for file_id, attachment_name in downloads))
+        return [path for path in paths if path is not None]
 
     async def upload_file(self, project_client: AIProjectClient, file_path: Path, purpose: str = "assistants") -> None:
-        """Upload a file to the project."""
-        self.log_msg_purple(f"Uploading file: {file_path}")
-        file_info = await project_client.agents.upload_file(file_path=file_path, purpose=purpose)
-        self.log_msg_purple(f"File uploaded with ID: {file_info.id}")
-        return file_info
+        """Upload a file to the project, reusing an earlier upload of the same content."""
+        digest = await self.upload_cache.digest(file_path)
+        key = f"file:{purpose}:{digest}"
+        async with self.upload_cache.lock(key):
+            file_info = await self.upload_cache.validated(key, project_client.agents.get_file)
+            if file_info is not None:
+                self.log_msg_purple(f"Reusing uploaded file {file_path} with ID: {file_info.id}")
+                return file_info
+
+            self.log_msg_purple(f"Uploading file: {file_path}")
+            file_info = await self._upload_with_retry(project_client, file_path, purpose)
+            self.upload_cache.put(key, file_info, source=Path(file_path).name)
+            self.log_msg_purple(f"File uploaded with ID: {file_info.id}")
+            return file_info
+
+    async def _upload_with_retry(self, project_client: AIProjectClient, file_path: Path, purpose: str):
+        """Upload a file, retrying transient failures with exponential backoff."""
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            try:
+                return await project_client.agents.upload_file(file_path=file_path, purpose=purpose)
+            except Exception as e:
+                if attempt == UPLOAD_ATTEMPTS or not is_transient(e):
+                    raise
+                delay = UPLOAD_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                logger.warning("Upload of %s failed (%s); retrying in %.1fs.", file_path, e, delay)
+                await asyncio.sleep(delay)
+
+    async def upload_files(
+        self,
+        project_client: AIProjectClient,
+        file_paths: list[Path],
+        purpose: str = "assistants",
+        max_concurrency: int = UPLOAD_CONCURRENCY,
+        progress: Optional[Callable[[int, int, Path], None]] = None,
+    ) -> list:
+        """Upload files concurrently, at most max_concurrency at a time.
+
+        Returns the file infos in the order of file_paths. progress(done, total, path)
+        is called as each file finishes.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        done = 0
+
+        async def upload(file_path: Path):
+            nonlocal done
+            async with semaphore:
+                file_info = await self.upload_file(project_client, file_path=file_path, purpose=purpose)
+            done += 1
+            if progress is not None:
+                progress(done, len(file_paths), file_path)
+            return file_info
+
+        return await asyncio.gather(*(upload(file_path) for file_path in file_paths))
 
     async def create_vector_store(
-        self, project_client: AIProjectClient, files: list[str], vector_store_name: str
+        self,
+        project_client: AIProjectClient,
+        files: list[str],
+        vector_store_name: str,
+        max_concurrency: int = UPLOAD_CONCURRENCY,
     ) -> None:
-        """Upload a file to the project."""
+        """Upload the files and index them in a vector store, reusing one built from the same files."""
 
-        file_ids = []
         prefix = self.shared_files_path
 
-        # Upload the files
-        for file in files:
-            file_path = prefix / file
-            file_info = await self.upload_file(project_client, file_path=file_path, purpose="assistants")
-            file_ids.append(file_info.id)
+        # Upload the files concurrently, then index them all with one vector store request
+        file_infos = await self.upload_files(
+            project_client,
+            [prefix / file for file in files],
+            max_concurrency=max_concurrency,
+            progress=lambda done, total, path: self.log_msg_purple(f"Uploaded {done}/{total}: {path.name}"),
+        )
+        file_ids = [file_info.id for file_info in file_infos]
 
-        self.log_msg_purple("Creating the vector store")
+        key = vector_store_key(vector_store_name, file_ids)
+        async with self.upload_cache.lock(key):
+            vector_store = await self.upload_cache.validated(
+                key,
+                project_client.agents.get_vector_store,
+                usable=lambda store: store.status not in UNUSABLE_VECTOR_STORE_STATES,
+            )
+            if vector_store is not None:
+                self.log_msg_purple(f"Reusing vector store with ID: {vector_store.id}")
+                return vector_store
 
-        # Create a vector store
-        vector_store = await project_client.agents.create_vector_store_and_poll(
-            file_ids=file_ids, name=vector_store_name
-        )
+            self.log_msg_purple("Creating the vector store")
+
+            # Create a vector store
+            vector_store = await project_client.agents.create_vector_store_and_poll(
+                file_ids=file_ids, name=vector_store_name
+            )
+            self.upload_cache.put(key, vector_store, source=vector_store_name)
 
         self.log_msg_purple(f"Vector store created and files added.")
         return vector_store